@@ -0,0 +1,189 @@
+from collections import Counter
+
+import pandas as pd
+
+from cqvs_columnar import ID_COLUMN
+from cqvs_forecast import RefillForecast
+
+# Aggregates a SharedTable keeps up to date as records change. Each is built
+# once from the table's frame (indexed by record ID), then adjusted with
+# add(row) / remove(row), where a row carries its ID under ID_COLUMN, so
+# reading a result never touches the table itself.
+
+
+def _missing(value):
+    return value is None or (not isinstance(value, str) and pd.isna(value))
+
+
+def name_key(value):
+    """How names are matched across entities: ignoring case and surrounding spaces."""
+    if _missing(value):
+        return None
+    return str(value).strip().casefold() or None
+
+
+class CountBy:
+    """Number of records per value of one column."""
+
+    def __init__(self, column):
+        self.column = column
+        self.counts = Counter()
+
+    def build(self, df):
+        self.counts = Counter()
+        if self.column in df.columns:
+            counts = df[self.column].value_counts()
+            self.counts.update(counts[counts > 0].to_dict())
+
+    def add(self, row):
+        value = row.get(self.column)
+        if not _missing(value):
+            self.counts[value] += 1
+
+    def remove(self, row):
+        value = row.get(self.column)
+        if _missing(value):
+            return
+        self.counts[value] -= 1
+        if self.counts[value] <= 0:
+            del self.counts[value]
+
+    def result(self):
+        return dict(self.counts.most_common())
+
+
+class Summary:
+    """(min, max, sum, count) of one numeric column.
+
+    Values are kept as a multiset so a delete can drop the current min/max
+    without rescanning the table; only the distinct values are rescanned.
+    """
+
+    def __init__(self, column):
+        self.column = column
+        self.values = Counter()
+        self.total = 0.0
+        self._bounds = None
+
+    def _parse_all(self, values):
+        return pd.to_numeric(values, errors="coerce")
+
+    def _parse(self, value):
+        if _missing(value):
+            return None
+        parsed = self._parse_all(pd.Series([value])).iloc[0]
+        return None if pd.isna(parsed) else parsed
+
+    def build(self, df):
+        self.values = Counter()
+        self.total = 0.0
+        self._bounds = None
+        if self.column in df.columns:
+            parsed = self._parse_all(df[self.column]).dropna()
+            self.values.update(parsed.value_counts().to_dict())
+            self.total = self._sum(parsed)
+
+    def _sum(self, parsed):
+        return float(parsed.sum())
+
+    def add(self, row):
+        value = self._parse(row.get(self.column))
+        if value is None:
+            return
+        self.values[value] += 1
+        self.total += self._sum(pd.Series([value]))
+        if self._bounds is not None:
+            low, high = self._bounds
+            self._bounds = (min(low, value), max(high, value))
+
+    def remove(self, row):
+        value = self._parse(row.get(self.column))
+        if value is None or value not in self.values:
+            return
+        self.values[value] -= 1
+        if self.values[value] <= 0:
+            del self.values[value]
+        self.total -= self._sum(pd.Series([value]))
+        if self._bounds is not None and value in self._bounds:
+            self._bounds = None
+
+    def result(self):
+        count = sum(self.values.values())
+        if not count:
+            return None, None, self.total, 0
+        if self._bounds is None:
+            self._bounds = (min(self.values), max(self.values))
+        return self._bounds[0], self._bounds[1], self.total, count
+
+
+class DateSummary(Summary):
+    """(earliest, latest, None, count) of one date column, parsed once per change."""
+
+    def _parse_all(self, values):
+        return pd.to_datetime(values, errors="coerce")
+
+    def _sum(self, parsed):
+        return 0.0
+
+    def result(self):
+        low, high, _, count = super().result()
+        return low, high, None, count
+
+
+class KeyIndex:
+    """Record IDs per name in one column (see name_key), for following references.
+
+    result() maps each name to a frozenset of IDs; only the names that
+    changed since the last call are re-frozen.
+    """
+
+    def __init__(self, column):
+        self.column = column
+        self.ids = {}
+        self._frozen = {}
+        self._dirty = set()
+
+    def build(self, df):
+        self.ids = {}
+        self._frozen = {}
+        self._dirty = set()
+        if self.column in df.columns:
+            keys = df[self.column].astype(object).map(name_key)
+            keys = keys[keys.notna()]
+            for key, ids in pd.Series(keys.index, index=keys.to_numpy()).groupby(level=0):
+                self.ids[key] = set(ids)
+                self._frozen[key] = frozenset(ids)
+
+    def add(self, row):
+        key = name_key(row.get(self.column))
+        if key is not None:
+            self.ids.setdefault(key, set()).add(row[ID_COLUMN])
+            self._dirty.add(key)
+
+    def remove(self, row):
+        key = name_key(row.get(self.column))
+        if key is None or key not in self.ids:
+            return
+        self.ids[key].discard(row[ID_COLUMN])
+        if not self.ids[key]:
+            del self.ids[key]
+        self._dirty.add(key)
+
+    def result(self):
+        for key in self._dirty:
+            if key in self.ids:
+                self._frozen[key] = frozenset(self.ids[key])
+            else:
+                self._frozen.pop(key, None)
+        self._dirty.clear()
+        return dict(self._frozen)
+
+
+AGGREGATES = {
+    "count_by": CountBy,
+    "summary": Summary,
+    "date_summary": DateSummary,
+    "key_index": KeyIndex,
+    # takes a cqvs_forecast.FORECAST_METHODS name where the others take a column
+    "refill_forecast": RefillForecast,
+}
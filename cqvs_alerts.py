@@ -0,0 +1,192 @@
+import operator
+import threading
+
+import pandas as pd
+
+from cqvs_forecast import forecast
+from cqvs_stores import store
+from cqvs_wash import SCANS_FILE, current_wash_metrics, wash_version
+
+# Alerts are declared as Rules and evaluated as one mask per rule over a
+# whole source frame. None of this touches Streamlit, so the same rules run
+# on a dashboard or from the command line (python cqvs_alerts.py).
+
+ALERT_COLUMNS = ["Rule", "Severity", "Subject", "Scope", "Value", "Message"]
+SEVERITIES = ["error", "warning"]
+DONE_STATUSES = ["Completed", "Done"]
+# The wash window (cqvs_wash.WASH_WINDOWS) missed washes are alerted over
+MISSED_WASH_WINDOW = 30
+
+_OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "==": operator.eq}
+
+
+class Rule:
+    """Rows of `source` where `column` `op` the limit raise an alert.
+
+    The limit is `threshold`, or `threshold` times another column when
+    `relative_to` is set. A threshold of "today" compares `column` as dates
+    against the current day. Rows whose `exclude` column holds one of the
+    listed values are skipped, as are rows whose `only` column holds none of
+    them. `message` is formatted with the row's columns.
+    Alerts are identified by (rule, subject, scope), so a duplicated row
+    raises its alert once.
+    """
+
+    def __init__(self, name, source, column, op, threshold, message, subject,
+                 scope=None, relative_to=None, exclude=None, only=None, severity="warning"):
+        self.name = name
+        self.source = source
+        self.column = column
+        self.op = op
+        self.threshold = threshold
+        self.message = message
+        self.subject = subject
+        self.scope = scope
+        self.relative_to = relative_to
+        self.exclude = exclude
+        self.only = only
+        self.severity = severity
+
+    def key(self):
+        return (
+            self.name, self.source, self.column, self.op, self.threshold, self.message,
+            self.subject, self.scope, self.relative_to, self.exclude and (self.exclude[0], tuple(self.exclude[1])),
+            self.only and (self.only[0], tuple(self.only[1])), self.severity,
+        )
+
+    def mask(self, df, now):
+        if self.column not in df.columns or (self.relative_to and self.relative_to not in df.columns):
+            return pd.Series(False, index=df.index)
+        if self.threshold == "today":
+            values = pd.to_datetime(df[self.column], errors="coerce")
+            limit = now.normalize()
+        else:
+            values = pd.to_numeric(df[self.column], errors="coerce")
+            limit = self.threshold
+            if self.relative_to:
+                limit = pd.to_numeric(df[self.relative_to], errors="coerce") * self.threshold
+        mask = _OPS[self.op](values, limit).fillna(False).astype(bool)
+        if self.exclude and self.exclude[0] in df.columns:
+            mask &= ~df[self.exclude[0]].isin(self.exclude[1])
+        if self.only:
+            mask &= df[self.only[0]].isin(self.only[1]) if self.only[0] in df.columns else False
+        return mask
+
+    def evaluate(self, df, now):
+        hits = df[self.mask(df, now)]
+        if hits.empty:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        rows = hits.to_dict("records")
+        if self.threshold == "today":
+            # compared as days, so shown as days
+            days = pd.to_datetime(hits[self.column], errors="coerce").dt.strftime("%Y-%m-%d")
+            for row, day in zip(rows, days):
+                row[self.column] = day
+        return pd.DataFrame({
+            "Rule": self.name,
+            "Severity": self.severity,
+            "Subject": hits[self.subject].to_numpy(),
+            "Scope": hits[self.scope].to_numpy() if self.scope else None,
+            "Value": hits[self.column].to_numpy(),
+            "Message": [self.message.format(**row) for row in rows],
+        })
+
+
+def missed_washes(n=1, window=MISSED_WASH_WINDOW):
+    # over one window: a miss counts in every longer window too, and would be raised once for each
+    return Rule(
+        "missed_washes", "wash", "Missed Washes", ">", n,
+        "{Vehicle} missed {Missed Washes} washes in last {Time Range (days)} days",
+        subject="Vehicle", only=("Time Range (days)", [window]),
+    )
+
+
+def refill_overdue(percent=25):
+    return Rule(
+        "refill_overdue", "refills", "Days Since Last", ">", 1 + percent / 100,
+        "{Site}: Refill overdue ({Days Since Last} days since last refill)",
+        subject="Site", relative_to="Avg Refill Gap (days)", severity="error",
+    )
+
+
+def task_overdue():
+    return Rule(
+        "task_overdue", "tasks", "Due", "<", "today",
+        "{Task} was due {Due}", subject="Task", exclude=("Status", DONE_STATUSES),
+    )
+
+
+DEFAULT_RULES = [missed_washes(1), refill_overdue(25), task_overdue()]
+
+
+def evaluate(rules, sources, now=None):
+    """Alerts raised by `rules` over `sources` (source name -> DataFrame), most severe first."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    results = [
+        rule.evaluate(sources[rule.source], now)
+        for rule in rules
+        if sources.get(rule.source) is not None
+    ]
+    results = [r for r in results if not r.empty]
+    if not results:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+    alerts = pd.concat(results, ignore_index=True)
+    alerts = alerts.drop_duplicates(subset=["Rule", "Subject", "Scope"], ignore_index=True)
+    rank = alerts["Severity"].map({s: i for i, s in enumerate(SEVERITIES)})
+    return alerts.iloc[rank.argsort(kind="stable")].reset_index(drop=True)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def fleet_version(now=None, forecast_method="mean_gap"):
+    """The version key fleet_sources() would return, without computing any sources."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    refills, tasks = store.table_version("refills"), store.table_version("tasks")
+    return (wash_version(SCANS_FILE, now), refills, tasks, forecast_method)
+
+
+def fleet_sources(now=None, forecast_method="mean_gap", wash=None, refills_forecast=None):
+    """(version key, sources) for the scan log and the stored refills and tasks.
+
+    The key changes whenever one of them does, and every WASH_REFRESH since
+    wash windows and due dates count from now. Wash metrics are only
+    recomputed on those same changes. `wash` and `refills_forecast` take
+    ones already computed for `now` (cqvs_parallel.py) instead.
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    if wash is None:
+        wash = current_wash_metrics(now=now)
+    wash_key = wash_version(SCANS_FILE, now)
+    # versions first: a change made while the sources are read brings on another evaluation
+    key = (wash_key, store.table_version("refills"), store.table_version("tasks"), forecast_method)
+    if refills_forecast is None:
+        refills_forecast = forecast(store.forecast_stats("refills", forecast_method), now)
+    sources = {
+        "wash": wash,
+        "refills": refills_forecast,
+        "tasks": store.frame("tasks"),
+    }
+    return key, sources
+
+
+def fleet_alerts(rules=DEFAULT_RULES, now=None, forecast_method="mean_gap"):
+    """Alerts over the scan log and the stored refills and tasks, cached until one of them changes."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    version, sources = fleet_sources(now, forecast_method)
+    key = ("alerts", tuple(r.key() for r in rules), version)
+    with _cache_lock:
+        if key not in _cache:
+            for stale in [k for k in _cache if k[0] == "alerts" and k[1] == key[1]]:
+                del _cache[stale]
+            _cache[key] = evaluate(rules, sources, now)
+        return _cache[key]
+
+
+if __name__ == "__main__":
+    alerts = fleet_alerts()
+    if alerts.empty:
+        print("No alerts")
+    for alert in alerts.to_dict("records"):
+        print(f"[{alert['Severity']}] {alert['Message']}")
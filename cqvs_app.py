@@ -0,0 +1,18 @@
+import streamlit as st
+
+from cqvs_pages import PAGES, load_page
+
+# The CMS in one app: streamlit run cqvs_app.py
+# Pages live in cqvs_pages/ (not pages/, which Streamlit would turn into its
+# own multipage navigation) and are loaded only when picked.
+
+
+def main():
+    st.set_page_config(page_title="CQVS CMS", layout="wide")
+    st.sidebar.title("CMS Navigation")
+    page = st.sidebar.radio("Go to", list(PAGES))
+    load_page(page).render()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import os
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from cqvs_aggregates import AGGREGATES
+from cqvs_columnar import ID_COLUMN, new_id
+from cqvs_schemas import check_records
+from cqvs_search import TextIndex, parse_query
+from cqvs_storage import (
+    CHANGE_LOG_SIZE, COMPACTING_SUFFIX, JOURNAL_SUFFIX, WriteConflict, append_change, apply_change, entity_of,
+    file_lock, load_table, read_journal_from,
+)
+
+# One copy of each entity per process, shared by every Streamlit session.
+# Every change bumps the table version and is logged with the record IDs it
+# touched, so a session can ask changes_since() what to refresh. Entries
+# another process appends to the journal are replayed here the same way; a
+# compaction or a rewritten snapshot reloads the table.
+
+
+def _file_stamp(filename):
+    stamp = []
+    for path in (filename, filename + COMPACTING_SUFFIX, filename + JOURNAL_SUFFIX):
+        try:
+            info = os.stat(path)
+            stamp.append((info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+class SharedTable:
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.RLock()
+        self.version = 0
+        self._store = None
+        self._stamp = None
+        self._offset = 0
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)  # (version, record IDs)
+        self._frame = None
+        self._frame_version = None
+        self._index = None
+        self._orders = {}
+        self._aggregates = {}
+
+    def _refresh(self):
+        stamp = _file_stamp(self.filename)
+        if self._store is not None and (stamp == self._stamp or self._tail(stamp)):
+            return
+        with file_lock(self.filename):
+            self._store, self._offset = load_table(self.filename)
+            self._stamp = _file_stamp(self.filename)
+        self._index = None
+        self._aggregates = {}
+        self._changes.clear()
+        self.version += 1
+
+    def _tail(self, stamp):
+        # Only the journal grew: replay what was appended since our offset.
+        journal = stamp[2]
+        if stamp[:2] != self._stamp[:2] or journal is None or journal[1] < self._offset:
+            return False
+        try:
+            entries, self._offset = read_journal_from(self.filename, self._offset)
+            for entry in entries:
+                self._apply_entry(entry)
+        except (OSError, ValueError, KeyError):
+            return False
+        self._stamp = stamp
+        return True
+
+    def changes_since(self, version):
+        """(current version, IDs of the records changed after `version`).
+
+        The IDs are None when the log doesn't reach back that far (or the
+        table was reloaded since), meaning anything may have changed.
+        """
+        with self.lock:
+            self._refresh()
+            floor = self._changes[0][0] - 1 if self._changes else self.version
+            if version is None or version < floor:
+                return self.version, None
+            changed = set()
+            for changed_at, ids in reversed(self._changes):
+                if changed_at <= version:
+                    break
+                changed.update(ids)
+            return self.version, changed
+
+    def refresh(self):
+        """Pick up changes made on disk since the last read; returns the (possibly new) version."""
+        with self.lock:
+            self._refresh()
+            return self.version
+
+    def record_version(self, record_id):
+        with self.lock:
+            self._refresh()
+            return self._store.version(record_id)
+
+    def __len__(self):
+        with self.lock:
+            self._refresh()
+            return len(self._store)
+
+    def frame(self):
+        """Read-only DataFrame view over the columnar store, rebuilt when the version moves."""
+        with self.lock:
+            self._refresh()
+            if self._frame_version != self.version:
+                self._frame = self._store.frame()
+                self._frame_version = self.version
+            return self._frame
+
+    def order(self, column=None, descending=False):
+        """Row positions sorted by `column` (missing values last), cached per version.
+
+        Ties, and column=None, fall back to insertion order.
+        """
+        with self.lock:
+            df = self.frame()
+            cache_key = (self.version, column, descending)
+            if cache_key not in self._orders:
+                # orders from older versions can't be asked for again
+                self._orders = {k: v for k, v in self._orders.items() if k[0] == self.version}
+                base = self._store.order()
+                if column is None:
+                    self._orders[cache_key] = base[::-1] if descending else base
+                    return self._orders[cache_key]
+                values = df[column].iloc[base].reset_index(drop=True)
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.cat.reorder_categories(sorted(values.cat.categories, key=str))
+                try:
+                    ordered = values.sort_values(ascending=not descending, kind="stable", na_position="last")
+                except TypeError:
+                    # mixed numbers and text in one column
+                    ordered = values.astype(str).where(values.notna()).sort_values(
+                        ascending=not descending, kind="stable", na_position="last"
+                    )
+                self._orders[cache_key] = base[ordered.index.to_numpy()]
+            return self._orders[cache_key]
+
+    def search(self, query):
+        """Positions of the rows matching a filter box query (see cqvs_search.parse_query),
+        in insertion order."""
+        with self.lock:
+            df = self.frame()
+            if self._index is None:
+                self._index = TextIndex.from_frame(df)
+            ids = self._index.search(parse_query(query, df.columns))
+            if ids is None:
+                return self.order()
+            positions = self._store.positions(list(ids))
+            return positions[np.argsort(self._store.order_keys(positions), kind="stable")]
+
+    def aggregate(self, kind, column):
+        """Result of one of cqvs_aggregates.AGGREGATES over `column`, maintained incrementally."""
+        with self.lock:
+            df = self.frame()
+            if (kind, column) not in self._aggregates:
+                aggregate = AGGREGATES[kind](column)
+                aggregate.build(df)
+                self._aggregates[(kind, column)] = aggregate
+            return self._aggregates[(kind, column)].result()
+
+    def apply(self, op, expected_version=None, **change):
+        """Journal a change and apply it.
+
+        With `expected_version`, an update or delete only goes ahead if the
+        record is still at that version; otherwise WriteConflict is raised.
+        Inserted and updated records must fit the entity's schema, or
+        cqvs_schemas.InvalidRecord is raised and nothing is written.
+        """
+        if op in ("insert", "update"):
+            check_records(entity_of(self.filename), change["records"] if op == "insert" else [change["record"]])
+        with self.lock, file_lock(self.filename):
+            self._refresh()
+            if op == "insert":
+                # IDs are assigned here so the journal replays to the same ones
+                change["records"] = [
+                    {ID_COLUMN: new_id(), **{k: v for k, v in r.items() if k != ID_COLUMN}}
+                    for r in change["records"]
+                ]
+            elif change["id"] not in self._store:
+                if expected_version is not None:
+                    raise WriteConflict(f"Record {change['id']} was deleted by someone else")
+                raise KeyError(f"No record {change['id']} in {self.filename}")
+            elif expected_version is not None and self._store.version(change["id"]) != expected_version:
+                raise WriteConflict(f"Record {change['id']} was changed by someone else")
+            # journal first: if the append fails the shared copy is untouched
+            self._offset = append_change(self.filename, op, **change)
+            self._stamp = _file_stamp(self.filename)
+            self._apply_entry({"op": op, **change})
+
+    def _apply_entry(self, entry):
+        op = entry["op"]
+        ids = [r[ID_COLUMN] for r in entry["records"]] if op == "insert" else [entry["id"]]
+        old_row = None
+        maintained = self._index is not None or self._aggregates
+        if maintained and op in ("update", "delete"):
+            old_row = self._store.row(entry["id"])
+        apply_change(self._store, entry)
+        self.version += 1
+        self._changes.append((self.version, ids))
+        if not maintained:
+            return
+        # index the stored (schema-typed) rows, not the raw input
+        new_rows = [self._store.row(i) for i in ids] if op != "delete" else []
+        if self._index is not None:
+            if op == "insert":
+                self._index.insert([{ID_COLUMN: i, **row} for i, row in zip(ids, new_rows)], ID_COLUMN)
+            elif op == "update":
+                self._index.update(entry["id"], old_row, new_rows[0])
+            else:
+                self._index.delete(entry["id"], old_row)
+        # aggregates get each row with its ID
+        for aggregate in self._aggregates.values():
+            if old_row is not None:
+                aggregate.remove({ID_COLUMN: entry["id"], **old_row})
+            for i, row in zip(ids, new_rows):
+                aggregate.add({ID_COLUMN: i, **row})
+
+
+_tables = {}
+_tables_guard = threading.Lock()
+
+
+def shared_table(filename):
+    with _tables_guard:
+        key = os.path.abspath(filename)
+        if key not in _tables:
+            _tables[key] = SharedTable(filename)
+        return _tables[key]
@@ -0,0 +1,333 @@
+import numbers
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from cqvs_schemas import coerce_column, is_categorical
+
+# Low-cardinality text columns stored as int32 codes into a category list,
+# for columns the entity schema doesn't declare
+CATEGORICAL_COLUMNS = ["Status", "Client", "Site", "Assigned To"]
+MISSING_CODE = -1
+# Persistent per-record ID, written as the first CSV column
+ID_COLUMN = "_id"
+# Per-record version, bumped by every update; written as the second CSV column
+VERSION_COLUMN = "_version"
+
+
+def new_id():
+    return uuid.uuid4().hex[:12]
+
+
+def _is_missing(value):
+    return value is None or value is pd.NaT or (isinstance(value, float) and value != value)
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+class ColumnStore:
+    """An entity table kept as one growable typed array per column.
+
+    `schema` maps columns to cqvs_schemas types; declared columns are
+    coerced on the way in, dates to datetime64 and categories to int32
+    codes. Otherwise numeric columns are int64/float64, CATEGORICAL_COLUMNS
+    are int32 codes and everything else is an object array. Records are
+    addressed by their ID through a hash index, so store[id] = record and
+    pop(id) are O(1):
+    a delete moves the last row into the hole, and a sequence number keeps
+    the insertion order for order(). Each record also carries a version
+    that starts at 1 and goes up with every update. frame() returns a
+    DataFrame over the arrays, indexed by ID. Once a view has been handed
+    out, the next update or delete copies the arrays first, so frames taken
+    earlier never change under their holders; appends only write past the
+    rows a view covers.
+
+    With keyed=False records get no IDs and can only be appended; frame()
+    is then indexed by position. That suits append-only logs such as scans.
+    """
+
+    def __init__(self, schema=None, keyed=True):
+        self._schema = schema or {}
+        self._keyed = keyed
+        self._n = 0
+        self._capacity = 0
+        self._columns = {}
+        self._categories = {}
+        self._codes = {}
+        self._ids = np.empty(0, dtype=object)
+        self._seq = np.empty(0, dtype=np.int64)
+        self._versions = np.empty(0, dtype=np.int64)
+        self._next_seq = 0
+        self._positions = {}
+        self._shared = False   # a view over the arrays has been handed out
+
+    @classmethod
+    def from_frame(cls, df, schema=None, keyed=True):
+        store = cls(schema, keyed)
+        store._extend_frame(df)
+        return store
+
+    def __len__(self):
+        return self._n
+
+    def __contains__(self, record_id):
+        return record_id in self._positions
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def position(self, record_id):
+        return self._positions[record_id]
+
+    def positions(self, record_ids):
+        return np.fromiter((self._positions[i] for i in record_ids), dtype=np.int64, count=len(record_ids))
+
+    def version(self, record_id):
+        return int(self._versions[self._positions[record_id]])
+
+    def order(self):
+        """Positions in insertion order."""
+        return np.argsort(self._seq[:self._n], kind="stable")
+
+    def order_keys(self, positions):
+        return self._seq[positions]
+
+    # --- storage ---
+
+    def _empty(self, name, size, dtype=None):
+        if name in self._categories:
+            return np.full(size, MISSING_CODE, dtype=np.int32)
+        if dtype is not None and dtype.kind in "if":
+            return np.full(size, 0 if dtype.kind == "i" else np.nan, dtype=dtype)
+        if dtype is not None and dtype.kind == "M":
+            return np.full(size, np.datetime64("NaT"), dtype=dtype)
+        return np.full(size, np.nan, dtype=object)
+
+    def _grow(self, needed):
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2, 16)
+        for name, arr in self._columns.items():
+            grown = self._empty(name, capacity, arr.dtype)
+            grown[:self._n] = arr[:self._n]
+            self._columns[name] = grown
+        ids = np.empty(capacity, dtype=object)
+        ids[:self._n] = self._ids[:self._n]
+        seq = np.zeros(capacity, dtype=np.int64)
+        seq[:self._n] = self._seq[:self._n]
+        versions = np.ones(capacity, dtype=np.int64)
+        versions[:self._n] = self._versions[:self._n]
+        self._ids, self._seq, self._versions = ids, seq, versions
+        self._capacity = capacity
+
+    def _is_categorical(self, name):
+        if name in self._schema:
+            return is_categorical(self._schema[name])
+        return name in CATEGORICAL_COLUMNS
+
+    def _coerce(self, name, values):
+        kind = self._schema.get(name)
+        if kind is None or is_categorical(kind) or kind == "text":
+            return values
+        values = coerce_column(kind, values)
+        if kind == "int":
+            # held as int64, or float64 while any are missing
+            return values.astype(float) if values.isna().any() else values.astype(np.int64)
+        return values
+
+    def _add_column(self, name, dtype):
+        if dtype is not None and dtype.kind == "M":
+            dtype = np.dtype("datetime64[ns]")
+        if self._is_categorical(name):
+            self._categories[name] = []
+            self._codes[name] = {}
+            self._columns[name] = self._empty(name, self._capacity)
+        else:
+            # earlier rows don't have it, so an int column starts out as float
+            if dtype is not None and dtype.kind == "i" and self._n:
+                dtype = np.dtype(float)
+            self._columns[name] = self._empty(name, self._capacity, dtype)
+
+    def _widen(self, name, dtype):
+        arr = self._columns[name]
+        if arr.dtype != dtype and arr.dtype != object:
+            arr = arr.astype(dtype)
+            self._columns[name] = arr
+        return arr
+
+    def _code(self, name, value):
+        if _is_missing(value):
+            return MISSING_CODE
+        codes = self._codes[name]
+        if value not in codes:
+            codes[value] = len(self._categories[name])
+            self._categories[name].append(value)
+        return codes[value]
+
+    def _set(self, name, i, value):
+        if name in self._categories:
+            self._columns[name][i] = self._code(name, value)
+            return
+        if name in self._schema and not _is_missing(value):
+            value = self._coerce(name, pd.Series([value], dtype=object)).iloc[0]
+        arr = self._columns[name]
+        if arr.dtype.kind == "M":
+            arr[i] = np.datetime64("NaT") if _is_missing(value) else pd.Timestamp(value).to_datetime64()
+            return
+        if arr.dtype.kind in "if":
+            if _is_missing(value) or (_is_number(value) and not float(value).is_integer()):
+                arr = self._widen(name, np.dtype(float))
+            if not (_is_missing(value) or _is_number(value)):
+                arr = self._widen(name, np.dtype(object))
+        arr[i] = value
+
+    def _extend_frame(self, df):
+        k = len(df)
+        if not k:
+            return
+        if not self._keyed:
+            ids = None
+            df = df.drop(columns=ID_COLUMN, errors="ignore")
+        elif ID_COLUMN in df.columns:
+            ids = [i if isinstance(i, str) else new_id() for i in df[ID_COLUMN]]
+            df = df.drop(columns=ID_COLUMN)
+        else:
+            ids = [new_id() for _ in range(k)]
+        if VERSION_COLUMN in df.columns:
+            versions = pd.to_numeric(df[VERSION_COLUMN], errors="coerce").fillna(1).to_numpy(dtype=np.int64)
+            df = df.drop(columns=VERSION_COLUMN)
+        else:
+            versions = 1
+        self._grow(self._n + k)
+        start, stop = self._n, self._n + k
+        self._versions[start:stop] = versions
+        self._seq[start:stop] = np.arange(self._next_seq, self._next_seq + k)
+        self._next_seq += k
+        if ids is not None:
+            self._ids[start:stop] = ids
+            for offset, record_id in enumerate(ids):
+                self._positions[record_id] = start + offset
+        for name in df.columns:
+            values = self._coerce(name, df[name])
+            dtype = values.dtype if values.dtype.kind in "ifM" else None
+            if name not in self._columns:
+                self._add_column(name, dtype)
+            arr = self._columns[name]
+            if name in self._categories:
+                local, uniques = pd.factorize(values, use_na_sentinel=True)
+                mapping = np.array([self._code(name, u) for u in uniques] + [MISSING_CODE], dtype=np.int32)
+                arr[start:stop] = mapping[local]
+                continue
+            if dtype is None or (dtype.kind == "M") != (arr.dtype.kind == "M"):
+                arr = self._widen(name, np.dtype(object))
+            elif dtype.kind == "f" or arr.dtype.kind == "f":
+                arr = self._widen(name, np.dtype(float))
+            arr[start:stop] = values.to_numpy(dtype=arr.dtype)
+        for name, arr in self._columns.items():
+            if name not in df.columns and name not in self._categories:
+                if arr.dtype.kind == "M":
+                    arr[start:stop] = np.datetime64("NaT")
+                else:
+                    self._widen(name, np.dtype(float))[start:stop] = np.nan
+        self._n = stop
+
+    # --- keyed operations used by the journal replay ---
+
+    def extend(self, records):
+        self._extend_frame(pd.DataFrame(list(records)))
+
+    def extend_frame(self, df):
+        self._extend_frame(df)
+
+    def _unshare(self):
+        # copy-on-write: the arrays views were handed out over are left as they are
+        if not self._shared:
+            return
+        self._columns = {name: arr.copy() for name, arr in self._columns.items()}
+        self._ids = self._ids.copy()
+        self._shared = False
+
+    def __setitem__(self, record_id, record):
+        i = self._positions[record_id]
+        self._unshare()
+        for name in record:
+            if name not in self._columns and name not in (ID_COLUMN, VERSION_COLUMN):
+                kind = self._schema.get(name)
+                self._add_column(name, np.dtype("datetime64[ns]") if kind in ("date", "datetime") else None)
+        for name in self._columns:
+            self._set(name, i, record.get(name, np.nan))
+        self._versions[i] += 1
+
+    def pop(self, record_id):
+        i = self._positions.pop(record_id)
+        self._unshare()
+        last = self._n - 1
+        if i != last:
+            for arr in self._columns.values():
+                arr[i] = arr[last]
+            self._ids[i] = self._ids[last]
+            self._seq[i] = self._seq[last]
+            self._versions[i] = self._versions[last]
+            self._positions[self._ids[i]] = i
+        for name, arr in self._columns.items():
+            arr[last:last + 1] = self._empty(name, 1, arr.dtype)
+        self._ids[last] = None
+        self._n = last
+
+    def row(self, record_id):
+        i = self._positions[record_id]
+        row = {}
+        for name, arr in self._columns.items():
+            if name in self._categories:
+                code = arr[i]
+                row[name] = self._categories[name][code] if code != MISSING_CODE else np.nan
+            elif arr.dtype.kind == "M":
+                row[name] = pd.Timestamp(arr[i])
+            else:
+                row[name] = arr[i]
+        return row
+
+    # --- views ---
+
+    def values(self, name):
+        """The array behind a non-categorical column; treat it as read-only."""
+        self._shared = True
+        return self._columns[name][:self._n]
+
+    def codes(self, name):
+        """(codes, categories) of a categorical column; MISSING_CODE marks a missing value."""
+        self._shared = True
+        return self._columns[name][:self._n], self._categories[name]
+
+    def frame(self):
+        """DataFrame over the arrays, indexed by ID; treat it as read-only.
+
+        It keeps showing the records as they are now: later updates and
+        deletes copy the arrays before writing (see _unshare).
+        """
+        self._shared = True
+        n = self._n
+        if self._keyed:
+            index = pd.Index(self._ids[:n], dtype=object, copy=False)
+        else:
+            index = pd.RangeIndex(n)
+        data = {}
+        for name, arr in self._columns.items():
+            if name in self._categories:
+                data[name] = pd.Categorical.from_codes(
+                    arr[:n], categories=pd.Index(self._categories[name], dtype=object), validate=False
+                )
+            else:
+                data[name] = pd.Series(arr[:n], index=index, dtype=arr.dtype, copy=False)
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def ordered_frame(self):
+        """Records in insertion order with the ID and version first, for writing out."""
+        order = self.order()
+        df = self.frame().iloc[order].rename_axis(ID_COLUMN).reset_index()
+        df.insert(1, VERSION_COLUMN, self._versions[order])
+        return df
@@ -0,0 +1,243 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from cqvs_export import EXPORT_FORMATS, export_formats, export_to_file, iter_chunks
+from cqvs_import import import_csv
+from cqvs_memo import memoize
+from cqvs_schemas import InvalidRecord
+from cqvs_storage import DATA_FILES, WriteConflict
+from cqvs_stores import store
+
+PAGE_SIZES = [25, 50, 100, 250, 1000]
+
+# Edits and deletes are checked against the record version this session saw
+# when it picked the record, so a save over someone else's newer one fails
+# with WriteConflict instead of silently replacing it.
+
+
+def _opened_version(key, action, record_id):
+    state_key = f"{action}_opened_{key}"
+    opened = st.session_state.get(state_key)
+    if opened is None or opened[0] != record_id:
+        opened = (record_id, store.version(key, record_id))
+        st.session_state[state_key] = opened
+    return opened[1]
+
+
+def _reopen(key, action, columns=()):
+    st.session_state.pop(f"{action}_opened_{key}", None)
+    for col in columns:
+        st.session_state.pop(f"{key}_{col}_edit", None)
+
+
+def render_changes(key, df):
+    """Note records other sessions changed since this one last showed the table."""
+    seen_key = f"seen_{key}"
+    version, changed = store.changes_since(key, st.session_state.get(seen_key))
+    st.session_state[seen_key] = version
+    changed = (changed or set()) - st.session_state.pop(f"saved_{key}", set())
+    if changed:
+        on_page = len(changed.intersection(df.index))
+        st.info(
+            f"{len(changed)} {key} record(s) were changed by other users since you last looked"
+            f" ({on_page} on this page)."
+        )
+
+
+def insert_from_form(key, record, saved_message):
+    """Insert a record from an add form, or say why it doesn't fit the schema."""
+    try:
+        store.insert(key, [record])
+    except InvalidRecord as exc:
+        st.error(f"Not saved: {exc}")
+    else:
+        st.success(saved_message)
+
+
+def _form_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d") if value == value.normalize() else str(value)
+    return str(value)
+
+
+def render_table(title, key):
+    st.subheader(title)
+
+    if store.count(key):
+        filter_text = st.text_input(
+            f"Filter {key}", key=f"filter_{key}",
+            help='Words must all match. Scope a word to a column with status:completed, '
+                 'end it with * for a prefix match, or quote a "whole phrase".',
+        ).lower()
+        total = store.count(key, filter_text)
+
+        col1, col2, col3, col4 = st.columns(4)
+        sort_by = col1.selectbox("Sort by", ["(none)"] + store.columns(key), key=f"sort_{key}")
+        descending = col2.checkbox("Descending", key=f"desc_{key}")
+        page_size = col3.selectbox("Rows per page", PAGE_SIZES, key=f"page_size_{key}")
+        pages = max(1, -(-total // page_size))
+        if st.session_state.get(f"page_{key}", 1) > pages:
+            st.session_state[f"page_{key}"] = pages
+        page = col4.number_input(f"Page (of {pages})", 1, pages, 1, key=f"page_{key}")
+        offset = (page - 1) * page_size
+        sort_by = None if sort_by == "(none)" else sort_by
+
+        df = store.frame(key, filter_text, limit=page_size, offset=offset, sort_by=sort_by, descending=descending)
+        render_changes(key, df)
+        if df.empty:
+            st.info("No matching records.")
+        else:
+            st.dataframe(df)
+            st.caption(f"Rows {offset + 1}–{offset + len(df)} of {total}")
+
+            # Rows are picked by the record ID shown as the table index, never by position
+            row_to_delete = st.selectbox("Record ID to delete", df.index, key=f"del_{key}")
+            delete_version = _opened_version(key, "delete", row_to_delete)
+            if st.button(f"Delete row from {key}"):
+                try:
+                    store.delete(key, row_to_delete, delete_version)
+                except WriteConflict:
+                    _reopen(key, "delete")
+                    st.error("Not deleted: someone else changed or deleted this record after you picked it.")
+                else:
+                    st.session_state[f"saved_{key}"] = {row_to_delete}
+                    st.success("Deleted row")
+                    st.rerun()
+
+            row_to_edit = st.selectbox("Record ID to edit", df.index, key=f"edit_{key}")
+            edit_version = _opened_version(key, "edit", row_to_edit)
+            edited = {}
+            for col in df.columns:
+                default = _form_value(df.loc[row_to_edit, col])
+                edited[col] = st.text_input(f"{col}", value=default, key=f"{key}_{col}_edit")
+            if st.button(f"Save Edit to {key}"):
+                try:
+                    store.update(key, row_to_edit, edited, edit_version)
+                except InvalidRecord as exc:
+                    st.error(f"Not saved: {exc}")
+                except WriteConflict:
+                    st.error("Not saved: someone else changed this record after you opened it.")
+                    st.button(
+                        "Reload record", key=f"reload_{key}", on_click=_reopen, args=(key, "edit", list(df.columns))
+                    )
+                else:
+                    _reopen(key, "edit")
+                    st.session_state[f"saved_{key}"] = {row_to_edit}
+                    st.success("Row updated")
+                    st.rerun()
+
+        render_export(key, filter_text, sort_by, descending)
+    else:
+        st.info("No records yet.")
+
+    render_bulk_upload(key)
+
+
+def render_bulk_upload(key):
+    st.markdown("### 📤 Bulk Upload CSV")
+    uploaded = st.file_uploader("Upload CSV", type="csv", key=f"upload_{key}")
+    # the uploader keeps its file across reruns, so remember what was imported
+    done_key = f"uploaded_{key}"
+    if uploaded and st.session_state.get(done_key) != (uploaded.name, uploaded.size):
+        bar = st.progress(0.0, text="Importing...")
+
+        def progress(fraction, imported, rejected):
+            bar.progress(fraction, text=f"Imported {imported} rows, rejected {rejected}")
+
+        try:
+            imported, rejected = import_csv(store, key, uploaded, progress=progress)
+        except ValueError as exc:
+            st.error(str(exc))
+            return
+        st.session_state[done_key] = (uploaded.name, uploaded.size)
+        st.session_state[f"rejected_{key}"] = rejected
+        st.success(f"Bulk upload complete: {imported} rows imported, {len(rejected)} rejected")
+
+    rejected = st.session_state.get(f"rejected_{key}")
+    if rejected is not None and not rejected.empty:
+        with st.expander(f"Rejected rows ({len(rejected)})"):
+            st.dataframe(rejected.head(PAGE_SIZES[-1]))
+            st.download_button(
+                "⬇ Rejected rows CSV", rejected.to_csv(index=False),
+                file_name=f"{key}_rejected.csv", mime="text/csv", key=f"rejected_dl_{key}",
+            )
+
+
+def render_export(key, filter_text, sort_by, descending):
+    # Nothing is serialised until someone asks for it, and then only one
+    # chunk at a time into a temp file. The file is read back once and
+    # removed straight away (the download button holds the bytes in memory
+    # either way), and the prepared export is dropped as soon as the format,
+    # filter or sort it was made for changes.
+    col1, col2 = st.columns(2)
+    fmt = col1.selectbox("Export format", export_formats(), key=f"export_fmt_{key}")
+    state_key = f"export_file_{key}"
+    request = (fmt, filter_text, sort_by, descending)
+    prepared = st.session_state.get(state_key)
+    if prepared and prepared[0] != request:
+        del st.session_state[state_key]
+    if col2.button("Prepare export", key=f"export_{key}"):
+        with st.spinner("Exporting..."):
+            path = export_to_file(iter_chunks(store, key, filter_text, sort_by, descending), fmt)
+            try:
+                with open(path, "rb") as fh:
+                    st.session_state[state_key] = (request, fh.read())
+            finally:
+                os.remove(path)
+
+    prepared = st.session_state.get(state_key)
+    if prepared:
+        suffix, mime = EXPORT_FORMATS[fmt]
+        file_name = os.path.splitext(DATA_FILES[key])[0] + suffix
+        st.download_button(f"⬇ Download {fmt}", prepared[1], file_name=file_name, mime=mime, key=f"download_{key}")
+
+
+@memoize(paths=("path",))
+def read_sheet(path):
+    """A spreadsheet export as it is, re-read only when the file changes."""
+    return pd.read_csv(path)
+
+
+def render_sheet(title, path):
+    """A read-only view of a spreadsheet export, if it's there; Bulk Upload imports it into a table."""
+    with st.expander(title):
+        if not os.path.exists(path):
+            st.info(f"No export found ({path}).")
+            return
+        df = read_sheet(path)
+        st.dataframe(df.head(PAGE_SIZES[-1]))
+        shown = f", first {PAGE_SIZES[-1]} shown" if len(df) > PAGE_SIZES[-1] else ""
+        st.caption(f"{len(df)} rows from {path}{shown}")
+
+
+def render_dashboard_summary():
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("Jobs Summary")
+        job_status_counts = store.value_counts("jobs", "Status")
+        if job_status_counts:
+            for status, count in job_status_counts.items():
+                st.write(f"{status}: {count}")
+        else:
+            st.write("No job data available")
+
+    with col2:
+        st.subheader("Refill History")
+        refill_count = store.count("refills")
+        if refill_count:
+            dates = store.column_stats("refills", "Date")
+            if dates is not None:
+                earliest, latest = pd.to_datetime([dates[0], dates[1]], errors="coerce")
+                st.write(f"Latest refill: {latest.date()}")
+                st.write(f"Earliest refill: {earliest.date()}")
+                st.write(f"Total refills: {refill_count}")
+            litres = store.column_stats("refills", "Litres")
+            if litres is not None:
+                st.write(f"Total litres refilled: {litres[2] or 0:.2f}")
+        else:
+            st.write("No refill data available")
@@ -0,0 +1,95 @@
+import gzip
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is only offered when pyarrow is installed
+    pa = pq = None
+
+CHUNK_ROWS = 10_000
+
+# label -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def export_formats():
+    return [f for f in EXPORT_FORMATS if f != "Parquet" or pq is not None]
+
+
+def iter_chunks(store, key, filter_text="", sort_by=None, descending=False, chunk_rows=CHUNK_ROWS):
+    """The filtered, sorted table as DataFrames of at most chunk_rows rows."""
+    total = store.count(key, filter_text)
+    for offset in range(0, total, chunk_rows):
+        yield store.frame(
+            key, filter_text, limit=chunk_rows, offset=offset, sort_by=sort_by, descending=descending
+        )
+
+
+def _write_csv(chunks, fh):
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(fh, index=False, header=header)
+        header = False
+
+
+def _parquet_chunk(chunk, schema):
+    # Columns are float64 or string; the first chunk decides which, later
+    # chunks are coerced to match so every row group shares one schema.
+    out = {}
+    for col in chunk.columns:
+        values = chunk[col]
+        numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        if schema is not None:
+            numeric = col in schema.names and pa.types.is_floating(schema.field(col).type)
+        if numeric:
+            out[col] = pd.to_numeric(values, errors="coerce").astype("float64")
+        else:
+            out[col] = values.astype(object).map(lambda v: None if pd.isna(v) else str(v))
+    df = pd.DataFrame(out)
+    if schema is not None:
+        df = df.reindex(columns=schema.names)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def _write_parquet(chunks, path):
+    writer = None
+    try:
+        for chunk in chunks:
+            table = _parquet_chunk(chunk, writer.schema if writer else None)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_to_file(chunks, fmt):
+    """Write chunks to a temp file in the given EXPORT_FORMATS format and return its path.
+
+    Only one chunk is held in memory at a time; the caller removes the file.
+    """
+    suffix = EXPORT_FORMATS[fmt][0]
+    fd, path = tempfile.mkstemp(prefix="cqvs_export_", suffix=suffix)
+    os.close(fd)
+    try:
+        if fmt == "CSV":
+            with open(path, "w", newline="", encoding="utf-8") as fh:
+                _write_csv(chunks, fh)
+        elif fmt == "CSV (gzip)":
+            with gzip.open(path, "wt", newline="", encoding="utf-8") as fh:
+                _write_csv(chunks, fh)
+        else:
+            _write_parquet(chunks, path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# How the expected gap to the next refill is estimated for each site:
+#   mean_gap     average days between refills
+#   ewm_gap      exponentially weighted gap, recent refills count most (EWM_ALPHA)
+#   consumption  litres used per day, and how long the last delivery lasts at that rate
+FORECAST_METHODS = ["mean_gap", "ewm_gap", "consumption"]
+EWM_ALPHA = 0.5
+
+STATS_COLUMNS = ["Refills", "Last Refill", "Avg Refill Gap (days)", "Avg Volume (L)", "Avg Cost ($AUD)"]
+FORECAST_COLUMNS = [
+    "Site", "Refills", "Last Refill", "Avg Refill Gap (days)", "Next Refill Forecast",
+    "Days Since Last", "Avg Volume (L)", "Avg Cost ($AUD)",
+]
+
+
+def _clean(refills):
+    df = pd.DataFrame({
+        "Site": refills["Site"].astype(object) if "Site" in refills else pd.Series(dtype=object),
+        "Date": pd.to_datetime(refills["Date"], errors="coerce") if "Date" in refills else pd.NaT,
+        "Litres": pd.to_numeric(refills["Litres"], errors="coerce") if "Litres" in refills else np.nan,
+        "Cost": pd.to_numeric(refills["Cost"], errors="coerce") if "Cost" in refills else np.nan,
+    })
+    df = df.dropna(subset=["Site", "Date"])
+    return df.sort_values(["Site", "Date"], kind="stable").reset_index(drop=True)
+
+
+def site_stats(refills, method="mean_gap", alpha=EWM_ALPHA):
+    """Per-site refill statistics from raw refill rows, in one grouped pass.
+
+    Returns a frame indexed by Site with STATS_COLUMNS. Sites with a single
+    refill have no gap.
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unknown forecast method {method!r}")
+    df = _clean(refills)
+    g = df.groupby("Site", sort=False)
+    # 0 for each site's latest refill, 1 for the one before, ...
+    from_end = g.cumcount(ascending=False)
+    days = (df["Date"] - g["Date"].transform("first")).dt.total_seconds() / 86400
+
+    stats = pd.DataFrame({
+        "Refills": g.size(),
+        "Last Refill": g["Date"].last(),
+        "Avg Volume (L)": g["Litres"].mean(),
+        "Avg Cost ($AUD)": g["Cost"].mean(),
+    })
+    span = g["Date"].last().sub(g["Date"].first()).dt.total_seconds() / 86400
+    multi = stats["Refills"] > 1
+
+    if method == "mean_gap":
+        gap = span / (stats["Refills"] - 1)
+    elif method == "ewm_gap":
+        gaps = days.groupby(df["Site"]).diff()
+        weight = ((1 - alpha) ** from_end).where(gaps.notna(), 0.0)
+        weighted = (weight * gaps.fillna(0)).groupby(df["Site"]).sum()
+        gap = weighted / weight.groupby(df["Site"]).sum()
+    else:
+        # a delivery is used up by the next refill, so the latest one is still in use
+        used = df["Litres"].where(from_end > 0).groupby(df["Site"]).sum()
+        latest = df["Litres"].where(from_end == 0).groupby(df["Site"]).sum(min_count=1)
+        rate = used / span
+        gap = (latest / rate).where(rate > 0)
+
+    stats["Avg Refill Gap (days)"] = gap.where(multi).astype(float).round(1)
+    stats = stats[STATS_COLUMNS]
+    stats.index.name = "Site"
+    return stats
+
+
+def forecast(stats, now=None):
+    """Next refill date and days since the last one for each site in a site_stats frame."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    df = stats.reset_index()
+    df["Next Refill Forecast"] = (df["Last Refill"] + pd.to_timedelta(df["Avg Refill Gap (days)"], unit="D")).dt.normalize()
+    df["Days Since Last"] = (now.normalize() - df["Last Refill"].dt.normalize()).dt.days
+    df["Avg Volume (L)"] = df["Avg Volume (L)"].round(1)
+    df["Avg Cost ($AUD)"] = df["Avg Cost ($AUD)"].round(2)
+    return df[FORECAST_COLUMNS].sort_values("Site", key=lambda s: s.astype(str), ignore_index=True)
+
+
+def refill_forecast(refills, now=None, method="mean_gap", alpha=EWM_ALPHA):
+    return forecast(site_stats(refills, method, alpha), now)
+
+
+def _key(row):
+    def clean(value):
+        return None if value is None or (not isinstance(value, str) and pd.isna(value)) else value
+    return tuple(clean(row.get(column)) for column in ("Site", "Date", "Litres", "Cost"))
+
+
+class RefillForecast:
+    """site_stats kept up to date as refills change (a cqvs_aggregates aggregate).
+
+    Built once from the whole table; a new, edited or deleted refill only
+    recomputes the stats of its own site.
+    """
+
+    def __init__(self, method="mean_gap"):
+        self.method = method
+        self.history = {}
+        self.stats = None
+
+    def build(self, df):
+        rows = df.reindex(columns=["Site", "Date", "Litres", "Cost"])
+        self.history = {}
+        for row in rows.to_dict("records"):
+            key = _key(row)
+            if key[0] is not None:
+                self.history.setdefault(key[0], []).append(key)
+        self.stats = site_stats(rows, self.method)
+
+    def _recompute(self, site):
+        rows = self.history.get(site)
+        stats = self.stats.drop(index=site, errors="ignore")
+        if rows:
+            fresh = site_stats(pd.DataFrame(rows, columns=["Site", "Date", "Litres", "Cost"]), self.method)
+            stats = pd.concat([stats, fresh]) if len(stats) else fresh
+        else:
+            self.history.pop(site, None)
+        self.stats = stats
+
+    def add(self, row):
+        key = _key(row)
+        if key[0] is not None:
+            self.history.setdefault(key[0], []).append(key)
+            self._recompute(key[0])
+
+    def remove(self, row):
+        key = _key(row)
+        if key in self.history.get(key[0], []):
+            self.history[key[0]].remove(key)
+            self._recompute(key[0])
+
+    def result(self):
+        return self.stats
@@ -0,0 +1,103 @@
+import pandas as pd
+
+from cqvs_aggregates import name_key
+from cqvs_schemas import NATURAL_KEYS, REQUIRED, SCHEMAS, parse_dates, record_problems
+
+IMPORT_CHUNK_ROWS = 5_000
+
+
+def validate_chunk(entity, chunk, seen_keys):
+    """Coerce one chunk to the entity schema.
+
+    Returns (accepted, rejected); rejected rows carry a "Reason" column.
+    seen_keys maps each natural key column to the name_key()s of the values
+    already stored or accepted earlier in this import, and is updated with
+    the accepted rows. Keys match the way cqvs_ingest dedupes: ignoring case
+    and surrounding spaces.
+    """
+    chunk = chunk.copy()
+    reasons = record_problems(entity, chunk)
+
+    def reject(mask, reason):
+        reasons[mask & (reasons == "")] = reason
+
+    for col, kind in SCHEMAS.get(entity, {}).items():
+        if col not in chunk.columns:
+            continue
+        if kind in ("date", "datetime"):
+            parsed = parse_dates(chunk[col])
+            fmt = "%Y-%m-%d" if kind == "date" else "%Y-%m-%d %H:%M:%S"
+            chunk[col] = parsed.dt.strftime(fmt).where(parsed.notna())
+        elif kind in ("number", "int"):
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+
+    for col in NATURAL_KEYS.get(entity, []):
+        if col not in chunk.columns:
+            continue
+        keys = chunk[col].astype(object).map(name_key)
+        present = keys.notna()
+        seen = seen_keys.setdefault(col, set())
+        reject(present & keys.isin(seen), f"duplicate {col}")
+        reject(present & keys.duplicated(), f"duplicate {col} in upload")
+
+    ok = reasons == ""
+    for col in NATURAL_KEYS.get(entity, []):
+        if col in chunk.columns:
+            seen_keys[col].update(chunk.loc[ok, col].astype(object).map(name_key).dropna())
+
+    rejected = chunk[~ok].assign(Reason=reasons[~ok])
+    return chunk[ok], rejected
+
+
+def import_csv(store, entity, source, chunk_rows=IMPORT_CHUNK_ROWS, progress=None):
+    """Stream a CSV into the store chunk by chunk.
+
+    Each accepted chunk is committed as it is read, so other sessions only
+    wait on one chunk's write. progress(fraction, imported, rejected) is
+    called after every chunk. Returns (imported count, rejected rows).
+    """
+    seen_keys = {
+        col: {name_key(value) for value in store.distinct(entity, col)} - {None}
+        for col in NATURAL_KEYS.get(entity, [])
+    }
+    size = _size(source)
+    imported = 0
+    rejected = []
+
+    # read as text, as cqvs_ingest does: validate_chunk converts the schema's number and date
+    # columns, and text such as phone numbers and ABNs keeps its leading zeros
+    for number, chunk in enumerate(pd.read_csv(source, chunksize=chunk_rows, dtype=str)):
+        if number == 0:
+            missing = [c for c in REQUIRED.get(entity, []) if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"Upload is missing required column(s): {', '.join(missing)}")
+        accepted, bad = validate_chunk(entity, chunk, seen_keys)
+        if not accepted.empty:
+            store.insert(entity, accepted.to_dict("records"))
+            imported += len(accepted)
+        if not bad.empty:
+            rejected.append(bad)
+        if progress is not None:
+            fraction = min(_position(source) / size, 1.0) if size else 1.0
+            progress(fraction, imported, sum(len(r) for r in rejected))
+
+    rejected = pd.concat(rejected, ignore_index=True) if rejected else pd.DataFrame()
+    return imported, rejected
+
+
+def _position(source):
+    try:
+        return source.tell()
+    except (AttributeError, OSError):
+        return 0
+
+
+def _size(source):
+    try:
+        here = source.tell()
+        source.seek(0, 2)
+        size = source.tell()
+        source.seek(here)
+        return size
+    except (AttributeError, OSError):
+        return 0
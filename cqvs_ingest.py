@@ -0,0 +1,203 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cqvs_aggregates import name_key
+from cqvs_import import validate_chunk
+from cqvs_scans import scan_log
+from cqvs_schemas import SCHEMAS, parse_dates
+from cqvs_storage import file_lock
+from cqvs_stores import store
+from cqvs_wash import SCANS_FILE
+
+# Watches a drop directory for exported CSVs and loads them:
+#
+#   python cqvs_ingest.py            # keep watching
+#   python cqvs_ingest.py --once     # ingest what's there now and exit
+#
+# Each file is classified by its header (INGEST_SIGNATURES), parsed and
+# validated in a process pool, stripped of records we already hold
+# (DEDUPE_KEYS) and published in one step: a single insert into the
+# configured store (cqvs_stores.py; one journal entry or one transaction)
+# for an entity table, or a single locked append to the scan log. The apps pick
+# new data up from there without a reload, so ingesting never holds up a
+# page. Files are only touched once their size and mtime stop changing,
+# then moved to done/ (with a .rejected.csv of any bad rows) or failed/.
+DROP_DIR = os.environ.get("CQVS_DROP", "drop")
+POLL_SECONDS = float(os.environ.get("CQVS_POLL_SECONDS", 5))
+INGEST_WORKERS = int(os.environ.get("CQVS_INGEST_WORKERS", os.cpu_count() or 1))
+
+# Columns a header must have to be taken for that entity, checked in order
+INGEST_SIGNATURES = {
+    "scans": ["Created", "Vehicle Name"],
+    "refills": ["Site", "Date", "Litres"],
+    "vehicles": ["Vehicle ID"],
+    "sites": ["Site Name"],
+}
+
+# A record is a repeat when any one of these column groups matches one already held
+DEDUPE_KEYS = {
+    "scans": [["Created", "Vehicle Name", "Site"]],
+    "refills": [["Site", "Date", "Litres", "Cost"]],
+    "vehicles": [["Vehicle ID"], ["Registration"]],
+    "sites": [["Site Name"]],
+}
+
+
+def classify(columns):
+    """The entity an export with these columns holds, or None."""
+    columns = set(columns)
+    return next((entity for entity, needed in INGEST_SIGNATURES.items() if columns.issuperset(needed)), None)
+
+
+def parse_export(path):
+    """(entity, accepted rows, rejected rows) of one export; runs in a worker process."""
+    entity = classify(pd.read_csv(path, nrows=0).columns)
+    if entity is None:
+        raise ValueError("header doesn't match any known export")
+    accepted, rejected = validate_chunk(entity, pd.read_csv(path, dtype=str), {})
+    return entity, accepted, rejected
+
+
+def _keys(entity, df, columns):
+    # one hashable key per row, compared the way the schema reads the values
+    parts = []
+    for column in columns:
+        if column not in df.columns:
+            return pd.Series([None] * len(df), index=df.index)
+        kind = SCHEMAS.get(entity, {}).get(column)
+        values = df[column]
+        if kind in ("date", "datetime"):
+            parsed = parse_dates(values)
+            part = parsed.dt.strftime("%Y-%m-%d %H:%M:%S").where(parsed.notna(), None)
+        elif kind in ("number", "int"):
+            numbers = pd.to_numeric(values, errors="coerce")
+            part = numbers.round(6).astype(object).where(numbers.notna(), None)
+        else:
+            part = values.astype(object).map(name_key)
+        parts.append(part.to_numpy())
+    keys = pd.Series(list(zip(*parts)), index=df.index, dtype=object)
+    return keys.where([None not in key for key in keys], None)
+
+
+def _held(entity, accepted):
+    """The records already stored that new ones could repeat."""
+    if entity != "scans":
+        return store.frame(entity)
+    if not os.path.exists(SCANS_FILE):
+        return pd.DataFrame()
+    scans, scan_index = scan_log(SCANS_FILE).snapshot()
+    # only scans in the new rows' time span can match them
+    created = parse_dates(accepted["Created"]).dropna()
+    if created.empty:
+        return scans.iloc[:0]
+    rows = scan_index.rows(None, created.min() - pd.Timedelta(seconds=1), created.max())
+    return scans.iloc[rows[rows < len(scans)]]
+
+
+def dedupe(entity, accepted):
+    """The accepted rows that aren't already held, nor repeats within the export."""
+    held = _held(entity, accepted)
+    keep = pd.Series(True, index=accepted.index)
+    for columns in DEDUPE_KEYS[entity]:
+        keys = _keys(entity, accepted, columns)
+        seen = set(_keys(entity, held, columns).dropna()) if len(held) else set()
+        repeat = keys.notna() & (keys.isin(seen) | keys.duplicated())
+        keep &= ~repeat
+    return accepted[keep]
+
+
+def _append_scans(rows):
+    with file_lock(SCANS_FILE):
+        exists = os.path.exists(SCANS_FILE) and os.path.getsize(SCANS_FILE) > 0
+        # written in the log's own column order, so the tail reads line up with its header
+        header = list(pd.read_csv(SCANS_FILE, nrows=0).columns) if exists else list(rows.columns)
+        text = rows.reindex(columns=header).to_csv(index=False, header=not exists)
+        with open(SCANS_FILE, "ab+") as fh:
+            fh.seek(0, os.SEEK_END)
+            if fh.tell():
+                fh.seek(-1, os.SEEK_END)
+                if fh.read(1) != b"\n":
+                    text = "\n" + text
+            fh.write(text.encode("utf-8"))
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+def publish(entity, rows):
+    """Add the rows in one step; readers see all of them or none."""
+    if rows.empty:
+        return
+    if entity == "scans":
+        _append_scans(rows)
+    else:
+        records = rows.astype(object).where(rows.notna(), None).to_dict("records")
+        store.insert(entity, records)
+
+
+def _move(path, folder):
+    target = os.path.join(os.path.dirname(path), folder)
+    os.makedirs(target, exist_ok=True)
+    destination = os.path.join(target, os.path.basename(path))
+    os.replace(path, destination)
+    return destination
+
+
+def _settled(directory, last_seen):
+    # exports still being copied in change between polls; take only the ones that didn't
+    current = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.lower().endswith(".csv") and os.path.isfile(path):
+            info = os.stat(path)
+            current[path] = (info.st_size, info.st_mtime_ns)
+    ready = [path for path, stamp in current.items() if last_seen.get(path) == stamp]
+    return ready, current
+
+
+def ingest(paths, pool):
+    """Parse the files in the pool, then dedupe and publish them here one by one."""
+    futures = {path: pool.submit(parse_export, path) for path in paths}
+    for path, future in futures.items():
+        try:
+            entity, accepted, rejected = future.result()
+            new = dedupe(entity, accepted)
+            publish(entity, new)
+        except Exception as error:  # a bad file (or a failed write) shouldn't stop the others
+            _move(path, "failed")
+            print(f"{os.path.basename(path)}: failed ({error})", flush=True)
+            continue
+        done = _move(path, "done")
+        if not rejected.empty:
+            rejected.to_csv(done[:-len(".csv")] + ".rejected.csv", index=False)
+        print(
+            f"{os.path.basename(path)}: {entity}, {len(new)} added, "
+            f"{len(accepted) - len(new)} already held, {len(rejected)} rejected",
+            flush=True,
+        )
+
+
+def run(directory=DROP_DIR, poll=POLL_SECONDS, workers=INGEST_WORKERS, once=False):
+    os.makedirs(directory, exist_ok=True)
+    last_seen = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            ready, last_seen = _settled(directory, last_seen)
+            if once:
+                ready = list(last_seen)
+            if ready:
+                ingest(ready, pool)
+            if once:
+                return
+            time.sleep(poll)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest CQVS exports dropped into a folder.")
+    parser.add_argument("--once", action="store_true", help="ingest the files there now and exit")
+    parser.add_argument("--dir", default=DROP_DIR, help=f"drop directory (default {DROP_DIR})")
+    args = parser.parse_args()
+    run(args.dir, once=args.once)
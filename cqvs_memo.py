@@ -0,0 +1,132 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Process-wide memo for loads and derived frames. Entries are keyed by the
+# function, its arguments and the (mtime, size) of every file argument, so
+# editing a file invalidates exactly the results computed from it. Frame
+# arguments are keyed by a hash of their contents. Least recently used
+# entries are dropped once the total passes CQVS_MEMO_BYTES.
+#
+# Results are shared between callers (and Streamlit sessions): don't modify them.
+MEMO_BYTES = int(os.environ.get("CQVS_MEMO_BYTES", 512 * 1024 * 1024))
+
+
+def file_stamp(path):
+    try:
+        info = os.stat(path)
+        return info.st_mtime_ns, info.st_size
+    except (FileNotFoundError, TypeError):
+        return None
+
+
+def sizeof(value, depth=3):
+    """Rough bytes held by a value: exact for frames and arrays, shallow beyond `depth`."""
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        return size + sum(sizeof(k, depth - 1) + sizeof(v, depth - 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(sizeof(v, depth - 1) for v in value)
+    if hasattr(value, "__dict__"):
+        return size + sizeof(vars(value), depth)
+    return size
+
+
+def _arg_key(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        labels = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        return ("frame", value.shape, tuple(map(str, labels)), int(pd.util.hash_pandas_object(value).sum()))
+    if isinstance(value, np.ndarray):
+        return ("array", value.shape, str(value.dtype), hash(value.tobytes()))
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((k, _arg_key(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_arg_key(v) for v in value))
+    return value
+
+
+class Memo:
+    def __init__(self, budget=MEMO_BYTES):
+        self.budget = budget
+        self.lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._latest = {}               # key without file stamps -> key
+        self.total = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, base, key, value):
+        size = sizeof(value)
+        with self.lock:
+            # the same call against older file contents can never be hit again
+            stale = self._latest.get(base)
+            if stale is not None and stale != key:
+                self._drop(stale)
+            if key in self._entries:
+                self._drop(key)
+            if size > self.budget:
+                return
+            self._entries[key] = (value, size)
+            self._latest[base] = key
+            self.total += size
+            while self.total > self.budget:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total -= entry[1]
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+            self._latest.clear()
+            self.total = 0
+
+
+memo = Memo()
+
+
+def memoize(paths=()):
+    """Memoize a function in the process-wide memo.
+
+    `paths` names the arguments that are file paths; their stamps are part of
+    the key, so the result is recomputed once one of those files changes.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            base = (func.__module__, func.__qualname__, _arg_key(tuple(bound.arguments.items())))
+            key = base + (tuple(file_stamp(bound.arguments[name]) for name in paths),)
+            entry = memo.get(key)
+            if entry is not None:
+                return entry[0]
+            value = func(*bound.args, **bound.kwargs)
+            memo.put(base, key, value)
+            return value
+
+        return wrapper
+    return decorate
@@ -0,0 +1,22 @@
+import importlib
+
+# Sidebar label -> module in this package. A page module is only imported
+# the first time its page is picked, and its render() only runs while it's
+# the page on screen, so a rerun costs what the visible page costs.
+PAGES = {
+    "Dashboard": "dashboard",
+    "Sites": "sites",
+    "Site Detail": "site_detail",
+    "Contacts": "contacts",
+    "Clients": "clients",
+    "Jobs": "jobs",
+    "Tasks": "tasks",
+    "Vehicles": "vehicles",
+    "Scans": "scans",
+    "Refills": "refills",
+    "Refill Forecast": "refill_forecast",
+}
+
+
+def load_page(name):
+    return importlib.import_module(f"{__name__}.{PAGES[name]}")
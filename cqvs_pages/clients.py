@@ -0,0 +1,20 @@
+import streamlit as st
+
+from cqvs_crud import insert_from_form, render_sheet, render_table
+
+# The client sites export from Notion, shown as it is
+CLIENT_SITES_SHEET = "clients_contacts/SE - QLD - Sites 20d6ed160c548001939bd5fd1fe1f212.csv"
+
+
+def render():
+    st.title("🏢 Clients")
+    with st.expander("➕ Add Client"):
+        client = st.text_input("Client", key="client_name")
+        industry = st.text_input("Industry", key="client_industry")
+        abn = st.text_input("ABN", key="client_abn")
+        if st.button("Save Client"):
+            insert_from_form("clients", {
+                "Client": client, "Industry": industry, "ABN": abn
+            }, "Saved client")
+    render_table("All Clients", "clients")
+    render_sheet("🏢 Client Sites and Notes (Notion export)", CLIENT_SITES_SHEET)
@@ -0,0 +1,17 @@
+import streamlit as st
+
+from cqvs_crud import insert_from_form, render_table
+
+
+def render():
+    st.title("📇 Contacts")
+    with st.expander("➕ Add Contact"):
+        name = st.text_input("Name", key="contact_name")
+        role = st.text_input("Role", key="contact_role")
+        phone = st.text_input("Phone", key="contact_phone")
+        email = st.text_input("Email", key="contact_email")
+        if st.button("Save Contact"):
+            insert_from_form("contacts", {
+                "Name": name, "Role": role, "Phone": phone, "Email": email
+            }, "Saved contact")
+    render_table("All Contacts", "contacts")
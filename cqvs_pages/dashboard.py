@@ -0,0 +1,53 @@
+import os
+
+import streamlit as st
+
+from cqvs_alerts import fleet_alerts
+from cqvs_crud import render_dashboard_summary
+from cqvs_results import ALERTS_RESULT, WASH_RESULT, current_result, describe_age
+from cqvs_wash import SCANS_FILE, WASH_WINDOWS, current_wash_metrics, empty_wash_metrics, score_badge
+
+
+def load_wash_metrics():
+    """(wash metrics or None without scans, when computed); stored by cqvs_scheduler.py while it runs."""
+    return current_result(WASH_RESULT, lambda: current_wash_metrics() if os.path.exists(SCANS_FILE) else None)
+
+
+def render():
+    st.title("📊 Vehicle Wash Dashboard")
+
+    with st.expander("Wash Performance Summary"):
+        days_range = st.selectbox("Select Time Range (days)", WASH_WINDOWS)
+        metrics, computed = load_wash_metrics()
+        if metrics is None:
+            st.info(f"No scan data found ({SCANS_FILE}).")
+            metrics = empty_wash_metrics()
+        summary_df = metrics[metrics["Time Range (days)"] == days_range]
+        st.subheader(f"Average Washes & Missed Washes (Last {days_range} days)")
+        st.dataframe(summary_df[["Vehicle", "Avg Washes", "Missed Washes", "Success Score"]])
+        st.caption(f"Updated {describe_age(computed)}")
+
+        if summary_df.empty:
+            st.info("No washes to score in this window.")
+        else:
+            st.markdown("### Wash Success Score (out of 100)")
+            scores = summary_df.astype({"Success Score": int}).nsmallest(10, "Success Score")
+            for row in scores.to_dict("records"):
+                st.markdown(f"- {row['Vehicle']}: {score_badge(row['Success Score'])} {row['Success Score']}")
+
+            st.markdown("### Wash Count Chart")
+            st.bar_chart(summary_df.set_index("Vehicle")["Avg Washes"])
+
+    # every alert rule, missed washes and overdue tasks included, is shown here once
+    render_fleet_alerts()
+    render_dashboard_summary()
+
+
+def render_fleet_alerts():
+    st.subheader("🚨 Fleet Alerts")
+    alerts, computed = current_result(ALERTS_RESULT, fleet_alerts)
+    if alerts.empty:
+        st.success("No alerts")
+    for alert in alerts.to_dict("records"):
+        (st.error if alert["Severity"] == "error" else st.warning)(alert["Message"])
+    st.caption(f"Updated {describe_age(computed)}")
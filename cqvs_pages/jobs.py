@@ -0,0 +1,22 @@
+import streamlit as st
+
+from cqvs_crud import insert_from_form, render_table
+from cqvs_schemas import JOB_STATUSES
+
+
+def render():
+    st.title("🛠️ Jobs")
+    with st.expander("➕ Add Job"):
+        number = st.text_input("Job #", key="job_number")
+        client = st.text_input("Client", key="job_client")
+        site = st.text_input("Site", key="job_site")
+        status = st.selectbox("Status", JOB_STATUSES, key="job_status")
+        assigned = st.text_input("Assigned To", key="job_assigned")
+        scope = st.text_area("Scope", key="job_scope")
+        notes = st.text_area("Notes", key="job_notes")
+        if st.button("Save Job"):
+            insert_from_form("jobs", {
+                "Job Number": number, "Client": client, "Site": site, "Status": status,
+                "Assigned To": assigned, "Scope": scope, "Notes": notes
+            }, "Saved job")
+    render_table("All Jobs", "jobs")
@@ -0,0 +1,35 @@
+import streamlit as st
+
+from cqvs_alerts import evaluate, refill_overdue
+from cqvs_crud import store
+from cqvs_forecast import FORECAST_METHODS, forecast
+from cqvs_results import current_result, describe_age, forecast_result
+
+METHOD_LABELS = {
+    "mean_gap": "Average gap",
+    "ewm_gap": "Recent gaps (weighted)",
+    "consumption": "Consumption rate",
+}
+
+
+def render():
+    st.title("⏳ Refill Forecast & Alerts")
+    method = st.selectbox("Forecast method", FORECAST_METHODS, format_func=METHOD_LABELS.get)
+
+    # cqvs_scheduler.py keeps the forecast up to date when it's running;
+    # otherwise the per-site stats are maintained as refills are recorded and
+    # only the date-dependent columns are worked out on each rerun
+    df_refill_stats, computed = current_result(
+        forecast_result(method), lambda: forecast(store.forecast_stats("refills", method))
+    )
+
+    st.dataframe(df_refill_stats)
+    st.caption(f"Updated {describe_age(computed)}")
+
+    st.subheader("🔻 Low Inventory")
+    for message in evaluate([refill_overdue(25)], {"refills": df_refill_stats})["Message"]:
+        st.error(message)
+
+    st.subheader("📆 Next Refill Plan")
+    for row in df_refill_stats.dropna(subset=["Next Refill Forecast"]).to_dict("records"):
+        st.write(f"{row['Site']} → Next Refill: **{row['Next Refill Forecast'].date()}** (avg every {row['Avg Refill Gap (days)']} days)")
@@ -0,0 +1,19 @@
+import streamlit as st
+
+from cqvs_crud import insert_from_form, render_sheet, render_table
+
+REFILLS_SHEET = "refills data - Sheet1.csv"
+
+
+def render():
+    st.title("🧪 Chemical Refills")
+    with st.expander("➕ Add Refill"):
+        site = st.text_input("Site", key="refill_site")
+        date = st.date_input("Date", key="refill_date")
+        litres = st.number_input("Litres", min_value=0.0, step=10.0, key="refill_litres")
+        cost = st.number_input("Cost ($AUD)", min_value=0.0, step=10.0, key="refill_cost")
+        if st.button("Save Refill"):
+            record = {"Site": site, "Date": str(date), "Litres": litres, "Cost": cost}
+            insert_from_form("refills", record, "Saved refill")
+    render_table("All Refills", "refills")
+    render_sheet("🧪 Refills Sheet (export)", REFILLS_SHEET)
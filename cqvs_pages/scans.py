@@ -0,0 +1,30 @@
+import os
+import pandas as pd
+import streamlit as st
+
+from cqvs_scans import load_scan_index, scan_activity
+from cqvs_wash import SCANS_FILE
+
+SCAN_WINDOWS = [1, 7, 30, 90]
+
+
+def render():
+    st.title("🧼 Wash Scans")
+    if not os.path.exists(SCANS_FILE):
+        st.info(f"No scan data found ({SCANS_FILE}).")
+        return
+
+    scan_index = load_scan_index(SCANS_FILE)
+    col1, col2 = st.columns(2)
+    site_filter = col1.selectbox("Filter by Site", ["All"] + scan_index.sites)
+    days = col2.selectbox("Last N days", SCAN_WINDOWS, index=1)
+    site = None if site_filter == "All" else site_filter
+    since = pd.Timestamp.now().floor("min") - pd.Timedelta(days=days)
+    washes, daily, top = scan_activity(SCANS_FILE, site, since)
+
+    st.subheader(f"Wash Activity - Last {days} Days")
+    st.write(f"{washes} washes recorded in the past {days} days.")
+    st.bar_chart(daily)
+
+    st.subheader("Top Vehicles by Wash Count")
+    st.bar_chart(top)
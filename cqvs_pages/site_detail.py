@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from cqvs_relations import referencing, scan_site
+from cqvs_results import RESULT_MAX_AGE, SITES_RESULT, describe_age, read_result, result_time
+from cqvs_rollups import VEHICLES_WINDOW, open_jobs, site_names, site_rollup, site_rollups
+from cqvs_scans import load_scan_index, scan_activity
+from cqvs_wash import SCANS_FILE
+
+CHART_DAYS = 90
+
+
+def _date(value):
+    return "—" if pd.isna(value) else f"{pd.Timestamp(value):%Y-%m-%d}"
+
+
+def _amount(value, fmt, prefix=""):
+    return "—" if value is None or pd.isna(value) else prefix + format(value, fmt)
+
+
+def render():
+    st.title("🏢 Site Detail")
+    names = site_names()
+    if not names:
+        st.info("No sites yet.")
+        return
+
+    site = st.selectbox("Site", names)
+    rollup = site_rollup(site)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Washes (7d)", rollup["Washes (7d)"])
+    col2.metric("Washes (30d)", rollup["Washes (30d)"])
+    col3.metric(f"Vehicles Seen ({VEHICLES_WINDOW}d)", rollup[f"Vehicles Seen ({VEHICLES_WINDOW}d)"])
+    col4.metric("Open Jobs", rollup["Open Jobs"])
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Refills", rollup["Refills"])
+    col2.metric("Next Refill", _date(rollup["Next Refill Forecast"]))
+    col3.metric("Litres to Date", _amount(rollup["Litres to Date"], ",.1f"))
+    col4.metric("Cost to Date", _amount(rollup["Cost to Date ($AUD)"], ",.2f", "$"))
+
+    if os.path.exists(SCANS_FILE):
+        scan_index = load_scan_index(SCANS_FILE)
+        name = scan_site(scan_index, site)
+        if name is not None:
+            st.subheader(f"Washes per Day - Last {CHART_DAYS} Days")
+            since = pd.Timestamp.now().floor("min") - pd.Timedelta(days=CHART_DAYS)
+            st.bar_chart(scan_activity(SCANS_FILE, name, since)[1])
+
+    st.subheader("Open Jobs")
+    st.dataframe(open_jobs(site))
+    st.subheader("Refills")
+    st.dataframe(referencing("refills", "Site", site))
+
+    with st.expander("All Sites"):
+        # cqvs_scheduler.py keeps this up to date when it's running; without
+        # it, every site is only worked out when asked for
+        written = result_time(SITES_RESULT)
+        stored = read_result(SITES_RESULT) if written is not None else None
+        if stored is not None and pd.Timestamp.now() - written <= RESULT_MAX_AGE:
+            st.dataframe(stored)
+            st.caption(f"Updated {describe_age(written)}")
+        elif st.button("Work out figures for every site"):
+            st.dataframe(site_rollups())
+        else:
+            note = "not precomputed" if stored is None else f"last precomputed {describe_age(written)}"
+            st.caption(f"Figures for every site are {note}: is the scheduler (cqvs_scheduler.py) running?")
@@ -0,0 +1,14 @@
+import streamlit as st
+
+from cqvs_crud import insert_from_form, render_table
+
+
+def render():
+    st.title("📍 Sites")
+    with st.expander("➕ Add Site"):
+        name = st.text_input("Site Name", key="site_name")
+        company = st.text_input("Company", key="site_company")
+        address = st.text_area("Address", key="site_address")
+        if st.button("Save Site"):
+            insert_from_form("sites", {"Site Name": name, "Company": company, "Address": address}, "Saved site")
+    render_table("All Sites", "sites")
@@ -0,0 +1,16 @@
+import streamlit as st
+
+from cqvs_crud import insert_from_form, render_table
+
+
+def render():
+    st.title("✅ Tasks")
+    with st.expander("➕ Add Task"):
+        task = st.text_input("Task", key="task_text")
+        due = st.date_input("Due", key="task_due")
+        who = st.text_input("Assigned To", key="task_who")
+        if st.button("Save Task"):
+            insert_from_form("tasks", {
+                "Task": task, "Due": str(due), "Assigned To": who
+            }, "Saved task")
+    render_table("All Tasks", "tasks")
@@ -0,0 +1,26 @@
+import streamlit as st
+
+from cqvs_crud import insert_from_form, render_sheet, render_table
+from cqvs_wash import DEFAULT_WASH_INTERVAL_DAYS
+
+VEHICLES_SHEET = "Vehicles data - Sheet1.csv"
+
+
+def render():
+    st.title("🚛 Vehicles")
+    with st.expander("➕ Add Vehicle"):
+        vehicle_id = st.text_input("Vehicle ID", key="vehicle_id")
+        type_ = st.text_input("Type", key="vehicle_type")
+        registration = st.text_input("Registration", key="vehicle_rego")
+        interval = st.number_input(
+            "Wash Interval (days)", min_value=0.0, value=DEFAULT_WASH_INTERVAL_DAYS, step=1.0, key="vehicle_interval",
+            help="How often this vehicle should be washed; scores count a missed wash per interval without one.",
+        )
+        notes = st.text_area("Notes", key="vehicle_notes")
+        if st.button("Save Vehicle"):
+            insert_from_form("vehicles", {
+                "Vehicle ID": vehicle_id, "Type": type_, "Registration": registration,
+                "Wash Interval (days)": interval, "Notes": notes,
+            }, "Saved vehicle")
+    render_table("All Vehicles", "vehicles")
+    render_sheet("🚛 Vehicle Directory (sheet export)", VEHICLES_SHEET)
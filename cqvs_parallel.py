@@ -0,0 +1,123 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cqvs_forecast import FORECAST_METHODS, forecast, site_stats
+from cqvs_scans import scan_log
+from cqvs_wash import SCANS_FILE, WASH_WINDOWS, empty_wash_metrics, wash_intervals, wash_metrics
+
+# Full recomputes of the per-vehicle and per-site analytics, split across a
+# process pool. Wash metrics (scores and missed washes) only look at one
+# vehicle's scans at a time and refill forecasts at one site's refills, so
+# vehicles and sites are dealt out into one partition per worker, largest
+# first, each partition computed in its own process and the pieces put back
+# in the order a single pass would give. Work too small to be worth shipping
+# to another process (under MIN_PARTITION_ROWS rows a partition) runs here.
+ANALYTICS_WORKERS = int(os.environ.get("CQVS_ANALYTICS_WORKERS", os.cpu_count() or 1))
+MIN_PARTITION_ROWS = 20_000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def analytics_pool():
+    """The process pool shared by every recompute in this process; shut down at exit."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=ANALYTICS_WORKERS)
+        return _pool
+
+
+@atexit.register
+def shutdown_analytics_pool():
+    """Stop the pool's workers, dropping queued work; the next recompute starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _partition_count(rows, keys, workers):
+    return max(1, min(workers, keys, rows // MIN_PARTITION_ROWS))
+
+
+def _deal(sizes, parts):
+    """Partition number for each key: biggest keys first, round robin, so partitions come out about even."""
+    order = np.argsort(-np.asarray(sizes), kind="stable")
+    assigned = np.empty(len(order), dtype=np.int64)
+    assigned[order] = np.arange(len(order)) % parts
+    return assigned
+
+
+def _run(function, jobs, parts):
+    if parts == 1:
+        return [function(*args) for args in jobs]
+    pool = analytics_pool()
+    return [future.result() for future in [pool.submit(function, *args) for args in jobs]]
+
+
+def _wash_part(scans, now, windows, intervals, first_seen):
+    return wash_metrics(scans, now=now, windows=windows, intervals=intervals, first_seen=first_seen)
+
+
+def parallel_wash_metrics(path=SCANS_FILE, now=None, windows=WASH_WINDOWS, intervals=None, workers=None):
+    """wash_metrics() of the scan log, partitioned by vehicle; same rows as current_wash_metrics().
+
+    `intervals` defaults to the vehicles' own (cqvs_wash.wash_intervals).
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    if not os.path.exists(path):
+        return empty_wash_metrics()
+    if intervals is None:
+        intervals = wash_intervals(path)
+    scans, scan_index = scan_log(path).snapshot()
+    rows = scan_index.rows(None, now - pd.Timedelta(days=max(windows)), now)
+    scans = scans.iloc[rows[rows < len(scans)]][["Created", "Vehicle Name"]]
+    first_seen = scan_index.first_seen()
+    first_seen = first_seen[first_seen <= now]
+
+    codes = first_seen.index.get_indexer(scans["Vehicle Name"].astype(object))
+    sizes = np.bincount(codes[codes >= 0], minlength=len(first_seen))
+    parts = _partition_count(len(scans), len(first_seen), ANALYTICS_WORKERS if workers is None else workers)
+    if parts == 1:
+        return wash_metrics(scans, now=now, windows=windows, intervals=intervals, first_seen=first_seen)
+    vehicle_part = _deal(sizes, parts)
+    scan_part = np.where(codes >= 0, vehicle_part[np.maximum(codes, 0)], -1)
+    jobs = [
+        (scans[scan_part == part], now, windows, intervals, first_seen[vehicle_part == part])
+        for part in range(parts)
+    ]
+    pieces = [piece for piece in _run(_wash_part, jobs, parts) if len(piece)]
+    if not pieces:
+        return empty_wash_metrics()
+    # back into first_seen's vehicle order, windows in order within each vehicle
+    df = pd.concat(pieces, ignore_index=True)
+    position = first_seen.index.get_indexer(df["Vehicle"])
+    return df.iloc[np.argsort(position, kind="stable")].reset_index(drop=True)
+
+
+def _forecast_part(refills, methods):
+    return {method: site_stats(refills, method) for method in methods}
+
+
+def parallel_refill_forecasts(refills, now=None, methods=FORECAST_METHODS, workers=None):
+    """{method: refill forecast} for every method, partitioned by site."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    sites = refills["Site"].astype(object) if "Site" in refills else pd.Series(dtype=object)
+    codes, names = pd.factorize(sites)
+    parts = _partition_count(len(refills), len(names), ANALYTICS_WORKERS if workers is None else workers)
+    if parts == 1:
+        jobs = [(refills, methods)]
+    else:
+        site_part = _deal(np.bincount(codes[codes >= 0], minlength=len(names)), parts)
+        row_part = site_part[np.maximum(codes, 0)]
+        jobs = [(refills[(codes >= 0) & (row_part == part)], methods) for part in range(parts)]
+    pieces = _run(_forecast_part, jobs, parts)
+    # forecast() sorts by site, so the pieces' order doesn't matter
+    return {method: forecast(pd.concat([piece[method] for piece in pieces]), now) for method in methods}
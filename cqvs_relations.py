@@ -0,0 +1,102 @@
+import os
+
+import pandas as pd
+
+from cqvs_aggregates import name_key
+from cqvs_scans import scan_log
+from cqvs_stores import store
+from cqvs_wash import SCANS_FILE
+
+# Entities refer to each other by name rather than ID: a job's Client is a
+# clients "Client", its Site a sites "Site Name". References are followed
+# through the configured store (cqvs_stores.py). On CSV each referencing
+# column, and each name column referred to, gets a key_index aggregate on
+# its table (cqvs_aggregates.KeyIndex), built on first use and kept up to
+# date with the table, so following a reference either way is a dict
+# lookup; SQLite runs a query. Names match ignoring case and surrounding
+# spaces. Scans are looked up by site
+# through the ScanIndex partitions (cqvs_scans.py).
+REFERENCES = {
+    ("jobs", "Client"): ("clients", "Client"),
+    ("jobs", "Site"): ("sites", "Site Name"),
+    ("jobs", "Assigned To"): ("contacts", "Name"),
+    ("tasks", "Assigned To"): ("contacts", "Name"),
+    ("refills", "Site"): ("sites", "Site Name"),
+    ("sites", "Company"): ("clients", "Client"),
+    ("contacts", "Company"): ("clients", "Client"),
+}
+
+
+def ids_where(entity, column, name):
+    """IDs of the `entity` records whose `column` holds `name`."""
+    return store.ids_where(entity, column, name)
+
+
+def records(entity, ids):
+    """The `entity` records with these IDs, in table order."""
+    return store.records(entity, ids)
+
+
+def referencing(entity, column, name):
+    """`entity` records whose `column` refers to `name`, e.g. referencing("jobs", "Site", "Depot")."""
+    return records(entity, ids_where(entity, column, name))
+
+
+def referenced(entity, column, name):
+    """The record(s) a reference points at, e.g. referenced("jobs", "Client", "Acme") is Acme's clients row."""
+    target_entity, target_column = REFERENCES[(entity, column)]
+    return referencing(target_entity, target_column, name)
+
+
+def scan_site(scan_index, site):
+    """How the scan log spells `site`, or None if it has no scans there."""
+    key = name_key(site)
+    return next((s for s in scan_index.sites if name_key(s) == key), None)
+
+
+def site_scans(site, start=None, end=None, path=SCANS_FILE):
+    """Scans at `site` in the (start, end] window, oldest first."""
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    scans, scan_index = scan_log(path).snapshot()
+    name = scan_site(scan_index, site)
+    if name is None:
+        return scans.iloc[:0]
+    rows = scan_index.rows(name, start, end)
+    return scans.iloc[rows[rows < len(scans)]]
+
+
+def site_records(site):
+    """Everything recorded against one site."""
+    return {
+        "sites": referencing("sites", "Site Name", site),
+        "jobs": referencing("jobs", "Site", site),
+        "refills": referencing("refills", "Site", site),
+        "scans": site_scans(site),
+    }
+
+
+def client_records(client):
+    """A client and its sites, contacts and jobs."""
+    return {
+        "clients": referencing("clients", "Client", client),
+        "sites": referencing("sites", "Company", client),
+        "contacts": referencing("contacts", "Company", client),
+        "jobs": referencing("jobs", "Client", client),
+    }
+
+
+def contact_records(name):
+    """The jobs and tasks assigned to one contact."""
+    return {
+        "jobs": referencing("jobs", "Assigned To", name),
+        "tasks": referencing("tasks", "Assigned To", name),
+    }
+
+
+def job_contacts(job_id):
+    """Contacts for a job: whoever it's assigned to, then everyone at its client."""
+    job = records("jobs", [job_id]).loc[job_id]
+    assigned = ids_where("contacts", "Name", job.get("Assigned To"))
+    at_client = ids_where("contacts", "Company", job.get("Client"))
+    return pd.concat([records("contacts", assigned), records("contacts", at_client - assigned)])
@@ -0,0 +1,86 @@
+import os
+import threading
+
+import pandas as pd
+
+# Results the scheduler (cqvs_scheduler.py) computes and the dashboards read.
+# Each result is one pickled DataFrame, replaced atomically so a reader sees
+# either the old or the new one. Readers keep the last copy they loaded and
+# only reload when the file changes. A result older than RESULT_MAX_AGE
+# (the scheduler has stopped) is recomputed by the reader instead.
+RESULTS_DIR = os.environ.get("CQVS_RESULTS", "results")
+RESULT_MAX_AGE = pd.Timedelta(seconds=float(os.environ.get("CQVS_RESULT_MAX_AGE", 900)))
+
+WASH_RESULT = "wash_metrics"
+ALERTS_RESULT = "alerts"
+SITES_RESULT = "site_rollups"
+
+
+def forecast_result(method):
+    return f"refill_forecast_{method}"
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def _path(name, directory):
+    return os.path.join(directory, name + ".pkl")
+
+
+def write_result(name, df, directory=RESULTS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = _path(name, directory)
+    tmp = path + ".tmp"
+    df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def read_result(name, directory=RESULTS_DIR):
+    """The latest stored result, or None if it hasn't been computed yet.
+
+    The frame is shared with every other reader in the process; don't modify it.
+    """
+    path = _path(name, directory)
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    stamp = (info.st_mtime_ns, info.st_size)
+    with _loaded_lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, pd.read_pickle(path))
+            _loaded[path] = cached
+        return cached[1]
+
+
+def result_time(name, directory=RESULTS_DIR):
+    """When a result was last written (local time, like pd.Timestamp.now()), or None."""
+    try:
+        return pd.Timestamp.fromtimestamp(os.path.getmtime(_path(name, directory)))
+    except FileNotFoundError:
+        return None
+
+
+def current_result(name, compute, max_age=RESULT_MAX_AGE, directory=RESULTS_DIR):
+    """(frame, when it was computed): the stored result while it's under max_age old, else compute() now."""
+    written = result_time(name, directory)
+    if written is not None and pd.Timestamp.now() - written <= max_age:
+        stored = read_result(name, directory)
+        if stored is not None:
+            return stored, written
+    return compute(), pd.Timestamp.now()
+
+
+def describe_age(when, now=None):
+    """'just now', '12 min ago', '3 h ago' or '2 days ago'."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    seconds = max(0.0, (now - when).total_seconds())
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h ago"
+    return f"{int(seconds // 86400)} days ago"
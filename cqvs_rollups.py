@@ -0,0 +1,142 @@
+import os
+import threading
+
+import pandas as pd
+
+from cqvs_aggregates import name_key
+from cqvs_alerts import DONE_STATUSES
+from cqvs_forecast import forecast, site_stats
+from cqvs_relations import ids_where, referencing, scan_site
+from cqvs_scans import load_scan_index, scan_log
+from cqvs_stores import store
+from cqvs_wash import SCANS_FILE, WASH_REFRESH
+
+# One row of figures per site for the site pages. Washes come off the
+# site's ScanIndex partition and refills and jobs from the site's records,
+# found through the key indexes (cqvs_relations.py). All of these are kept
+# up to date as the data changes, so a site's row costs lookups and work on
+# that site's own records, not table scans. Rows are cached per site until
+# WASH_REFRESH passes or that site's scans, refills or jobs change: a change
+# elsewhere in the tables (found through changes_since) leaves them be.
+SITE_WASH_WINDOWS = [7, 30, 90]
+VEHICLES_WINDOW = 30
+ROLLUP_COLUMNS = [
+    "Site", *[f"Washes ({days}d)" for days in SITE_WASH_WINDOWS], f"Vehicles Seen ({VEHICLES_WINDOW}d)",
+    "Refills", "Last Refill", "Avg Refill Gap (days)", "Next Refill Forecast",
+    "Litres to Date", "Cost to Date ($AUD)", "Open Jobs",
+]
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def site_names(path=SCANS_FILE):
+    """Every site named in the sites table, jobs, refills or the scan log; the first spelling wins."""
+    names = {}
+    candidates = [
+        store.value_counts("sites", "Site Name"),
+        store.value_counts("jobs", "Site"),
+        store.value_counts("refills", "Site"),
+    ]
+    if os.path.exists(path):
+        candidates.append(load_scan_index(path).sites)
+    for source in candidates:
+        for name in source:
+            names.setdefault(name_key(name), str(name).strip())
+    names.pop(None, None)
+    return sorted(names.values(), key=str.casefold)
+
+
+def open_jobs(site):
+    """Jobs at `site` that aren't done yet."""
+    jobs = referencing("jobs", "Site", site)
+    if "Status" not in jobs.columns:
+        return jobs
+    return jobs[~jobs["Status"].astype(object).isin(DONE_STATUSES)]
+
+
+def _wash_figures(site, as_of, path):
+    figures = {f"Washes ({days}d)": 0 for days in SITE_WASH_WINDOWS}
+    figures[f"Vehicles Seen ({VEHICLES_WINDOW}d)"] = 0
+    if not os.path.exists(path):
+        return figures
+    scan_index = load_scan_index(path)
+    name = scan_site(scan_index, site)
+    if name is None:
+        return figures
+    for days in SITE_WASH_WINDOWS:
+        figures[f"Washes ({days}d)"] = scan_index.count(name, as_of - pd.Timedelta(days=days))
+    since = as_of - pd.Timedelta(days=VEHICLES_WINDOW)
+    figures[f"Vehicles Seen ({VEHICLES_WINDOW}d)"] = scan_index.vehicles_seen(name, since)
+    return figures
+
+
+def _total(df, column, digits):
+    if column not in df.columns:
+        return 0.0
+    return round(float(pd.to_numeric(df[column], errors="coerce").sum()), digits)
+
+
+def _refill_figures(site, method, now):
+    refills = referencing("refills", "Site", site)
+    # one site's refills, however its name is spelled on each
+    stats = site_stats(refills.assign(Site=site), method)
+    row = forecast(stats, now).iloc[0] if len(stats) else {}
+    return {
+        "Refills": int(row.get("Refills", 0)),
+        "Last Refill": row.get("Last Refill", pd.NaT),
+        "Avg Refill Gap (days)": row.get("Avg Refill Gap (days)"),
+        "Next Refill Forecast": row.get("Next Refill Forecast", pd.NaT),
+        "Litres to Date": _total(refills, "Litres", 1),
+        "Cost to Date ($AUD)": _total(refills, "Cost", 2),
+    }
+
+
+def _scans_key(site, path):
+    # the site's scans only grow between full loads of the log
+    if not os.path.exists(path):
+        return None
+    scan_index = load_scan_index(path)
+    name = scan_site(scan_index, site)
+    return scan_log(path).loads, name, 0 if name is None else scan_index.count(name)
+
+
+def _records_changed(entity, site, since, ids):
+    # did any of the site's records, then or now, change after version `since`?
+    version, changed = store.changes_since(entity, since)
+    return changed is None or bool(changed & (ids | ids_where(entity, "Site", site)))
+
+
+def site_rollup(site, now=None, method="mean_gap", path=SCANS_FILE):
+    """ROLLUP_COLUMNS for one site, as a dict."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    as_of = now.floor(WASH_REFRESH)
+    # versions first: a change made while the row is worked out brings on another
+    versions = {entity: store.table_version(entity) for entity in ("refills", "jobs")}
+    key = (as_of, _scans_key(site, path))
+    site_key = (name_key(site), method, path)
+    with _cache_lock:
+        cached = _cache.get(site_key)
+    if cached is not None and cached["key"] == key and not any(
+        cached["versions"][entity] != versions[entity]
+        and _records_changed(entity, site, cached["versions"][entity], cached["ids"][entity])
+        for entity in versions
+    ):
+        cached["versions"] = versions
+        return cached["row"]
+    ids = {entity: ids_where(entity, "Site", site) for entity in versions}
+    row = {
+        "Site": site,
+        **_wash_figures(site, as_of, path),
+        **_refill_figures(site, method, as_of),
+        "Open Jobs": len(open_jobs(site)),
+    }
+    with _cache_lock:
+        _cache[site_key] = {"key": key, "versions": versions, "ids": ids, "row": row}
+    return row
+
+
+def site_rollups(now=None, method="mean_gap", path=SCANS_FILE):
+    """ROLLUP_COLUMNS for every site in site_names()."""
+    rows = [site_rollup(site, now, method, path) for site in site_names(path)]
+    return pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
@@ -0,0 +1,345 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cqvs_columnar import MISSING_CODE, ColumnStore
+from cqvs_memo import file_stamp, memoize
+from cqvs_schemas import SCHEMAS, parse_entity, read_entity
+from cqvs_storage import file_lock
+
+DAY_NS = 86_400 * 10**9
+
+
+def _ns(when):
+    return pd.Timestamp(when).value
+
+
+def _grown(arr, needed, fill=0):
+    if needed <= len(arr):
+        return arr
+    grown = np.full(max(needed, 2 * len(arr), 16), fill, dtype=arr.dtype)
+    grown[:len(arr)] = arr
+    return grown
+
+
+class _Partition:
+    """One site's scans (or all of them): timestamps sorted ascending, the
+    matching vehicle codes and row positions, and scan counts per day.
+
+    The arrays have spare capacity, so appending newer scans costs what
+    the new scans cost.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self._ts = np.empty(0, dtype=np.int64)
+        self._vehicles = np.empty(0, dtype=np.int64)
+        self._rows = np.empty(0, dtype=np.int64)
+        self.per_day = np.zeros(0, dtype=np.int64)
+
+    @property
+    def ts(self):
+        return self._ts[:self.n]
+
+    @property
+    def vehicles(self):
+        return self._vehicles[:self.n]
+
+    @property
+    def rows(self):
+        return self._rows[:self.n]
+
+    def extend(self, ts, vehicles, rows, days, n_days):
+        """Append scans no older than the newest one held, sorted by time."""
+        stop = self.n + len(ts)
+        self._ts, self._vehicles, self._rows = (_grown(a, stop) for a in (self._ts, self._vehicles, self._rows))
+        self._ts[self.n:stop], self._vehicles[self.n:stop], self._rows[self.n:stop] = ts, vehicles, rows
+        self.per_day = _grown(self.per_day, n_days)
+        np.add.at(self.per_day, days, 1)
+        self.n = stop
+
+    def bounds(self, start=None, end=None):
+        ts = self.ts
+        lo = 0 if start is None else np.searchsorted(ts, _ns(start), side="right")
+        hi = len(ts) if end is None else np.searchsorted(ts, _ns(end), side="right")
+        return lo, hi
+
+
+class ScanIndex:
+    """Scans sorted by Created and partitioned by Site.
+
+    Window queries are a binary search into the partition; nothing copies
+    or rescans the scans table after construction. Windows are
+    (start, end]: strictly after start, up to and including end.
+
+    extend() appends scans that are no older than the newest one indexed;
+    anything older needs a new index.
+    """
+
+    def __init__(self, scans=None):
+        self.sites = []
+        self.vehicles = np.empty(0, dtype=object)
+        self.day0 = None
+        self.n_days = 0
+        self.latest = None
+        self._first_seen = np.empty(0, dtype=np.int64)
+        self._all = _Partition()
+        self._sites = {}
+        if scans is not None and len(scans):
+            created = pd.to_datetime(scans["Created"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+            vehicle_codes, vehicles = pd.factorize(scans["Vehicle Name"])
+            site_codes, sites = pd.factorize(scans["Site"])
+            self.extend(created, vehicle_codes, list(vehicles), site_codes, list(sites), np.arange(len(scans)))
+
+    def extend(self, created, vehicle_codes, vehicle_names, site_codes, site_names, rows):
+        """Index more scans: Created as datetime64, Vehicle Name and Site as codes into
+        the name lists (-1 for missing), and their row positions in the scans frame."""
+        keep = ~np.isnat(created)
+        ts = created[keep].astype(np.int64)
+        if not len(ts):
+            return
+        if self.latest is not None and ts.min() < self.latest:
+            raise ValueError("scans older than the index; build a new one")
+        vehicle_codes, site_codes, rows = (
+            np.asarray(a)[keep].astype(np.int64) for a in (vehicle_codes, site_codes, rows)
+        )
+        self.vehicles = np.asarray(vehicle_names, dtype=object)
+        if self.day0 is None:
+            self.day0 = ts.min() // DAY_NS * DAY_NS
+        self.latest = ts.max()
+        self.n_days = int((self.latest - self.day0) // DAY_NS) + 1
+        first_seen = _grown(self._first_seen, len(self.vehicles), np.iinfo(np.int64).max)
+        known = vehicle_codes != MISSING_CODE
+        np.minimum.at(first_seen, vehicle_codes[known], ts[known])
+        self._first_seen = first_seen
+
+        order = np.argsort(ts, kind="stable")
+        days = (ts - self.day0) // DAY_NS
+        self._all.extend(ts[order], vehicle_codes[order], rows[order], days[order], self.n_days)
+        # one lexsort groups the new scans by site and keeps each group time-ordered
+        by_site = np.lexsort((ts, site_codes))
+        sorted_sites = site_codes[by_site]
+        for code in np.unique(sorted_sites):
+            if code == MISSING_CODE:
+                continue
+            lo, hi = np.searchsorted(sorted_sites, [code, code + 1])
+            part = by_site[lo:hi]
+            site = site_names[code]
+            if site not in self._sites:
+                self._sites[site] = _Partition()
+            self._sites[site].extend(ts[part], vehicle_codes[part], rows[part], days[part], self.n_days)
+        self.sites = sorted(self._sites, key=str)
+
+    def first_seen(self):
+        """Each vehicle's earliest scan, as a Series indexed by Vehicle Name."""
+        seen = self._first_seen[:len(self.vehicles)]
+        known = seen != np.iinfo(np.int64).max
+        return pd.Series(pd.to_datetime(seen[known]), index=pd.Index(self.vehicles[known], name="Vehicle Name"))
+
+    def _partition(self, site=None):
+        if site is None:
+            return self._all
+        return self._sites.get(site)
+
+    def __len__(self):
+        return len(self._all.ts)
+
+    def count(self, site=None, start=None, end=None):
+        part = self._partition(site)
+        if part is None:
+            return 0
+        lo, hi = part.bounds(start, end)
+        return int(hi - lo)
+
+    def rows(self, site=None, start=None, end=None):
+        """Positions, in the frame the index was built from, of the scans in the window, oldest first."""
+        part = self._partition(site)
+        if part is None:
+            return np.empty(0, dtype=np.int64)
+        lo, hi = part.bounds(start, end)
+        return part.rows[lo:hi]
+
+    def vehicles_seen(self, site=None, start=None, end=None):
+        """Number of distinct vehicles scanned in the window."""
+        part = self._partition(site)
+        if part is None:
+            return 0
+        lo, hi = part.bounds(start, end)
+        vehicles = part.vehicles[lo:hi]
+        return len(np.unique(vehicles[vehicles != MISSING_CODE]))
+
+    def top_vehicles(self, site=None, start=None, end=None, n=5):
+        """Wash counts of the n most-washed vehicles in the window, as a Series."""
+        part = self._partition(site)
+        if part is None:
+            return pd.Series(dtype=int, name="count")
+        lo, hi = part.bounds(start, end)
+        vehicles = part.vehicles[lo:hi]
+        counts = np.bincount(vehicles[vehicles != MISSING_CODE], minlength=len(self.vehicles))
+        top = np.argsort(-counts, kind="stable")[:n]
+        top = top[counts[top] > 0]
+        return pd.Series(counts[top], index=pd.Index(self.vehicles[top], name="Vehicle Name"), name="count")
+
+    def daily_counts(self, site=None, start=None, end=None):
+        """Scans per calendar day between start and end, read off the day buckets."""
+        part = self._partition(site)
+        if part is None or not self.n_days:
+            return pd.Series(dtype=int)
+        first = 0 if start is None else max(0, (_ns(start) - self.day0) // DAY_NS)
+        last = self.n_days - 1 if end is None else min(self.n_days - 1, (_ns(end) - self.day0) // DAY_NS)
+        if first > last:
+            return pd.Series(dtype=int)
+        counts = np.zeros(last + 1 - first, dtype=np.int64)
+        held = part.per_day[first:min(last + 1, self.n_days)]
+        counts[:len(held)] = held
+        days = pd.to_datetime(self.day0 + np.arange(first, last + 1) * DAY_NS)
+        return pd.Series(counts, index=days)
+
+
+class ScanLog:
+    """A scans CSV held in memory and kept current by parsing only what's appended.
+
+    Scan exports only ever grow, so a refresh reads from the byte offset
+    it stopped at, up to the last complete line. The rows are appended to
+    a ColumnStore and, while they are no older than the newest scan so far,
+    to the ScanIndex; older rows rebuild the index. A file that shrank or
+    whose already-read bytes changed is loaded again from scratch.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.version = 0
+        self.loads = 0   # full (re)loads; rows keep their positions between them
+        self._stamp = None
+        self._store = None
+        self._index = None
+        self._frame = None
+        self._offset = 0
+        self._header = b""
+        self._mark = b""   # the bytes just before _offset, to spot a rewritten file
+
+    def _load(self):
+        while True:
+            stamp = file_stamp(self.path)
+            with open(self.path, "rb") as fh:
+                self._header = fh.readline()
+            scans = read_entity("scans", self.path)
+            if file_stamp(self.path) == stamp:
+                break
+            # appended to while we read it; the offset must match what was parsed
+        self._store = ColumnStore.from_frame(scans, SCHEMAS["scans"], keyed=False)
+        self._index = None
+        self.loads += 1
+        self._set_offset(stamp[1])
+        return stamp
+
+    def _set_offset(self, offset):
+        self._offset = offset
+        with open(self.path, "rb") as fh:
+            fh.seek(max(0, offset - 64))
+            self._mark = fh.read(offset - max(0, offset - 64))
+
+    def _unchanged_before(self, size):
+        if size < self._offset or not self._mark.endswith(b"\n"):
+            return False
+        with open(self.path, "rb") as fh:
+            header = fh.readline()
+            fh.seek(self._offset - len(self._mark))
+            return header == self._header and fh.read(len(self._mark)) == self._mark
+
+    def _read_tail(self):
+        with open(self.path, "rb") as fh:
+            fh.seek(self._offset)
+            data = fh.read()
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        start = len(self._store)
+        self._store.extend_frame(parse_entity("scans", self._header + data[:end]))
+        self._set_offset(self._offset + end)
+        if self._index is not None:
+            try:
+                self._index_rows(self._index, start)
+            except ValueError:
+                self._index = None
+
+    def _index_rows(self, index, start=0):
+        if start >= len(self._store):
+            return
+        vehicles, vehicle_names = self._store.codes("Vehicle Name")
+        sites, site_names = self._store.codes("Site")
+        index.extend(
+            self._store.values("Created")[start:], vehicles[start:], vehicle_names, sites[start:], site_names,
+            np.arange(start, len(self._store)),
+        )
+
+    def refresh(self):
+        with self.lock:
+            stamp = file_stamp(self.path)
+            if stamp is None:
+                raise FileNotFoundError(self.path)
+            if stamp == self._stamp:
+                return
+            # writers append under the same lock (cqvs_ingest.py), so no half-written batch is read
+            with file_lock(self.path):
+                if self._store is not None and self._unchanged_before(stamp[1]):
+                    # keep the stamp from before the read: an exporter appending without our
+                    # lock after it must still look like a change next time
+                    self._read_tail()
+                else:
+                    stamp = self._load()
+            self._stamp = stamp
+            self._frame = None
+            self.version += 1
+
+    def snapshot(self):
+        """(scans frame, ScanIndex), current as of now; treat both as read-only.
+
+        The frame is indexed by row position, which is what the index's
+        rows() returns. The index keeps growing with the file, so clip its
+        positions to the frame's length.
+        """
+        self.refresh()
+        with self.lock:
+            if self._frame is None:
+                self._frame = self._store.frame()
+            if self._index is None:
+                self._index = ScanIndex()
+                self._index_rows(self._index)
+            return self._frame, self._index
+
+
+_logs = {}
+_logs_guard = threading.Lock()
+
+
+def scan_log(path):
+    with _logs_guard:
+        key = os.path.abspath(path)
+        if key not in _logs:
+            _logs[key] = ScanLog(path)
+        return _logs[key]
+
+
+def load_scans(path):
+    """The scans in a CSV, kept current as the file grows."""
+    return scan_log(path).snapshot()[0]
+
+
+def load_scan_index(path):
+    """ScanIndex over a scans CSV, kept current as the file grows."""
+    return scan_log(path).snapshot()[1]
+
+
+@memoize(paths=("path",))
+def scan_activity(path, site=None, start=None, n=5):
+    """(washes, washes per day, top n vehicles) at a site since `start`, recomputed when the file changes.
+
+    Callers floor `start` (to the minute, say) so reruns hit the memo.
+    """
+    scan_index = load_scan_index(path)
+    top = scan_index.top_vehicles(site, start, n=n)
+    return scan_index.count(site, start), scan_index.daily_counts(site, start), top
@@ -0,0 +1,68 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from cqvs_alerts import DEFAULT_RULES, evaluate, fleet_sources, fleet_version
+from cqvs_parallel import parallel_refill_forecasts, parallel_wash_metrics
+from cqvs_results import ALERTS_RESULT, SITES_RESULT, WASH_RESULT, forecast_result, write_result
+from cqvs_rollups import site_rollups
+from cqvs_stores import store
+
+# Recomputes wash metrics, refill forecasts, alerts and site rollups into
+# the results store (cqvs_results.py) so the dashboards only read them. Run
+# it next to the Streamlit apps:
+#
+#   python cqvs_scheduler.py            # keep running
+#   python cqvs_scheduler.py --once     # one pass, e.g. from cron
+#
+# Results are rewritten as soon as the scans, refills, tasks or jobs change,
+# and every CQVS_SCHEDULE_SECONDS regardless, so "days since" figures stay
+# current. Wash metrics and refill forecasts are computed on a process pool
+# (cqvs_parallel.py, CQVS_ANALYTICS_WORKERS processes).
+POLL_SECONDS = float(os.environ.get("CQVS_POLL_SECONDS", 5))
+SCHEDULE_SECONDS = float(os.environ.get("CQVS_SCHEDULE_SECONDS", 300))
+
+
+def _jobs_version():
+    return store.table_version("jobs")
+
+
+def recompute(now=None):
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    # taken first, so a change made while this pass runs brings on another
+    key = (fleet_version(now), _jobs_version())
+    wash = parallel_wash_metrics(now=now)
+    forecasts = parallel_refill_forecasts(store.frame("refills"), now)
+    _, sources = fleet_sources(now, wash=wash, refills_forecast=forecasts["mean_gap"])
+    write_result(WASH_RESULT, wash)
+    for method, df in forecasts.items():
+        write_result(forecast_result(method), df)
+    write_result(ALERTS_RESULT, evaluate(DEFAULT_RULES, sources, now))
+    write_result(SITES_RESULT, site_rollups(now))
+    return key
+
+
+def run(poll=POLL_SECONDS, every=SCHEDULE_SECONDS):
+    last_key, last_run = None, 0.0
+    while True:
+        try:
+            key = (fleet_version(), _jobs_version())
+            if key != last_key or time.monotonic() - last_run >= every:
+                last_key = recompute()
+                last_run = time.monotonic()
+                print(f"{pd.Timestamp.now():%Y-%m-%d %H:%M:%S} results updated", flush=True)
+        except Exception as error:  # a bad or half-replaced file; the next poll tries again
+            print(f"{pd.Timestamp.now():%Y-%m-%d %H:%M:%S} recompute failed ({error!r})", flush=True)
+        time.sleep(poll)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute CQVS dashboard results.")
+    parser.add_argument("--once", action="store_true", help="recompute once and exit")
+    args = parser.parse_args()
+    if args.once:
+        recompute()
+    else:
+        run()
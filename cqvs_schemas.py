@@ -0,0 +1,160 @@
+import io
+
+import pandas as pd
+
+from cqvs_snapshot import read_with_sidecar
+
+JOB_STATUSES = ["Quote", "Scheduled", "In Progress", "Completed"]
+
+# Entity columns and their types:
+#   "text"       free text
+#   "category"   text with few distinct values, held as categorical codes
+#   "number"     float
+#   "int"        whole number, nullable
+#   "date"       calendar date, "datetime" date and time; both parsed once on load
+#   [values]     one of a fixed list, held as a category
+# Columns not listed here are kept as free text.
+SCHEMAS = {
+    "sites": {"Site Name": "text", "Company": "category", "Address": "text"},
+    "contacts": {"Name": "text", "Role": "category", "Phone": "text", "Email": "text"},
+    "clients": {"Client": "text", "Industry": "category", "ABN": "text"},
+    "jobs": {
+        "Job Number": "text", "Client": "category", "Site": "category", "Status": JOB_STATUSES,
+        "Assigned To": "category", "Scope": "text", "Notes": "text",
+    },
+    "tasks": {"Task": "text", "Due": "date", "Assigned To": "category", "Status": "category"},
+    "refills": {"Site": "category", "Date": "date", "Litres": "number", "Cost": "number"},
+    "vehicles": {
+        "Vehicle ID": "text", "Type": "category", "Registration": "text", "Wash Interval (days)": "number",
+        "Notes": "text",
+    },
+    "scans": {
+        "Created": "datetime", "Site": "category", "Vehicle Name": "category",
+        "Vehicle ID": "category", "Wash Type": "category",
+    },
+}
+
+# Columns that must be filled in on every record
+REQUIRED = {
+    "jobs": ["Job Number"],
+    "vehicles": ["Vehicle ID"],
+}
+
+# Columns whose non-blank values identify a record; imports skip repeats
+NATURAL_KEYS = {
+    "jobs": ["Job Number"],
+    "vehicles": ["Vehicle ID", "Registration"],
+}
+
+
+class InvalidRecord(ValueError):
+    """A record that doesn't fit its entity's schema; the message says why."""
+
+
+def is_categorical(kind):
+    return kind == "category" or isinstance(kind, list)
+
+
+def _blank(values):
+    return values.isna() | (values.astype(str).str.strip() == "")
+
+
+def parse_dates(values):
+    """Dates from text: ISO first (what we write), then any other format, day first."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("datetime64[ns]")
+    parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    retry = parsed.isna() & values.notna() & (values.astype(str).str.strip() != "")
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], errors="coerce", format="mixed", dayfirst=True)
+    return parsed.astype("datetime64[ns]")
+
+
+def coerce_column(kind, values):
+    """One column converted to its schema type; values that don't fit become missing."""
+    if kind in ("date", "datetime"):
+        return parse_dates(values)
+    if kind == "number":
+        return pd.to_numeric(values, errors="coerce").astype(float)
+    if kind == "int":
+        numbers = pd.to_numeric(values, errors="coerce")
+        return numbers.where(numbers == numbers.round()).astype("Int64")
+    if is_categorical(kind):
+        return values.astype("category")
+    return values
+
+
+def record_problems(entity, df):
+    """Why each row of df doesn't fit the entity's schema: the first problem found, "" if none.
+
+    Blank values are allowed except in REQUIRED columns; anything else must
+    parse as its column's type or be one of its fixed values.
+    """
+    reasons = pd.Series("", index=df.index)
+
+    def reject(mask, reason):
+        reasons[mask & (reasons == "")] = reason
+
+    for col in REQUIRED.get(entity, []):
+        reject(_blank(df[col]) if col in df.columns else pd.Series(True, index=df.index), f"missing {col}")
+
+    for col, kind in SCHEMAS.get(entity, {}).items():
+        if col not in df.columns:
+            continue
+        values = df[col]
+        present = ~_blank(values)
+        if kind in ("date", "datetime"):
+            reject(present & parse_dates(values).isna(), f"bad date in {col}")
+        elif kind in ("number", "int"):
+            parsed = pd.to_numeric(values, errors="coerce")
+            bad = parsed.isna() if kind == "number" else parsed.isna() | (parsed != parsed.round())
+            reject(present & bad, f"bad {'whole ' if kind == 'int' else ''}number in {col}")
+        elif isinstance(kind, list):
+            reject(present & ~values.isin(kind), f"{col} must be one of {', '.join(kind)}")
+    return reasons
+
+
+def check_records(entity, records):
+    """Raise InvalidRecord unless every record fits the entity's schema."""
+    df = pd.DataFrame(list(records))
+    if df.empty:
+        return
+    problems = record_problems(entity, df)
+    problems = list(dict.fromkeys(problems[problems != ""]))
+    if problems:
+        raise InvalidRecord("; ".join(problems))
+
+
+def coerce_frame(entity, df):
+    """A copy of df with every declared column converted to its schema type."""
+    df = df.copy()
+    for column, kind in SCHEMAS.get(entity, {}).items():
+        if column in df.columns:
+            df[column] = coerce_column(kind, df[column])
+    return df
+
+
+def read_entity(entity, path, **kwargs):
+    """Read a CSV with the entity's schema: categories and text come in as such, dates parsed once.
+
+    Served from an Arrow sidecar (cqvs_snapshot.py) while the CSV is unchanged.
+    """
+    version = repr((SCHEMAS.get(entity), sorted(kwargs.items(), key=str)))
+    return read_with_sidecar(path, lambda p: parse_entity(entity, p, **kwargs), version)
+
+
+def parse_entity(entity, source, **kwargs):
+    """Parse CSV from a path, or from bytes (header line included), with the entity's schema."""
+    def open_source():
+        return io.BytesIO(source) if isinstance(source, bytes) else source
+
+    dtype = {}
+    for column, kind in SCHEMAS.get(entity, {}).items():
+        if is_categorical(kind):
+            dtype[column] = "category"
+        elif kind == "text":
+            dtype[column] = object
+    header = pd.read_csv(open_source(), nrows=0).columns
+    dtype = {c: t for c, t in dtype.items() if c in header}
+    return coerce_frame(entity, pd.read_csv(open_source(), dtype={**dtype, **kwargs.pop("dtype", {})}, **kwargs))
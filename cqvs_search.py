@@ -0,0 +1,138 @@
+import shlex
+
+import numpy as np
+import pandas as pd
+
+GRAM = 3
+
+
+def _grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def _text(value):
+    # dates are indexed the way they're written, 2025-06-24, not as timestamps
+    if isinstance(value, pd.Timestamp) and value == value.normalize():
+        return value.strftime("%Y-%m-%d")
+    return str(value).lower()
+
+
+def _norm_column(name):
+    return str(name).lower().replace(" ", "").replace("_", "")
+
+
+def parse_query(text, columns):
+    """Split a filter box query into (column or None, term, prefix) triples.
+
+    Terms are ANDed. `status:completed` scopes a term to one column (spaces
+    and underscores in the column name are optional, so `assigned_to:jonny`
+    works), a trailing * makes the term a prefix match and quotes keep a
+    phrase together.
+    """
+    try:
+        parts = shlex.split(text)
+    except ValueError:
+        parts = text.split()
+    by_name = {_norm_column(c): c for c in columns}
+    terms = []
+    for part in parts:
+        column = None
+        head, sep, rest = part.partition(":")
+        if sep and rest and _norm_column(head) in by_name:
+            column, part = by_name[_norm_column(head)], rest
+        prefix = len(part) > 1 and part.endswith("*")
+        if prefix:
+            part = part[:-1]
+        part = part.lower()
+        if part:
+            terms.append((column, part, prefix))
+    return terms
+
+
+class TextIndex:
+    """Trigram index over the distinct (column, value) pairs of one table.
+
+    Each distinct value maps to the set of record IDs holding it. Queries
+    only touch the distinct values whose trigrams match, which for
+    categorical columns is a handful however many rows there are.
+    """
+
+    def __init__(self):
+        self._vids = {}     # (column, text) -> value id
+        self._values = []   # value id -> (column, text)
+        self._rows = []     # value id -> set of record IDs
+        self._grams = {}    # trigram -> set of value ids
+
+    @classmethod
+    def from_frame(cls, df):
+        index = cls()
+        index.extend_frame(df)
+        return index
+
+    def _vid(self, column, text):
+        vid = self._vids.get((column, text))
+        if vid is None:
+            vid = len(self._values)
+            self._vids[(column, text)] = vid
+            self._values.append((column, text))
+            self._rows.append(set())
+            for gram in _grams(text):
+                self._grams.setdefault(gram, set()).add(vid)
+        return vid
+
+    def _add_row(self, key, row):
+        for column, value in row.items():
+            if not pd.isna(value):
+                self._rows[self._vid(column, _text(value))].add(key)
+
+    def _remove_row(self, key, row):
+        for column, value in row.items():
+            if pd.isna(value):
+                continue
+            vid = self._vids.get((column, _text(value)))
+            if vid is not None:
+                self._rows[vid].discard(key)
+
+    def extend_frame(self, df):
+        """Index a frame whose index holds the record IDs."""
+        keys = df.index.to_numpy()
+        for column in df.columns:
+            codes, uniques = pd.factorize(df[column])
+            if not len(uniques):
+                continue
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            for code, value in enumerate(uniques):
+                rows = keys[order[bounds[code]:bounds[code + 1]]]
+                self._rows[self._vid(column, _text(value))].update(rows.tolist())
+
+    def insert(self, records, id_column):
+        self.extend_frame(pd.DataFrame(list(records)).set_index(id_column))
+
+    def update(self, record_id, old_row, record):
+        self._remove_row(record_id, old_row)
+        self._add_row(record_id, record)
+
+    def delete(self, record_id, old_row):
+        self._remove_row(record_id, old_row)
+
+    def search(self, terms):
+        """IDs of the records matching every term, or None when there are no terms."""
+        matched = None
+        for column, text, prefix in terms:
+            if len(text) >= GRAM:
+                postings = sorted((self._grams.get(g, set()) for g in _grams(text)), key=len)
+                candidates = postings[0].intersection(*postings[1:])
+            else:
+                candidates = range(len(self._values))
+            rows = set()
+            for vid in candidates:
+                col, value = self._values[vid]
+                if column is not None and col != column:
+                    continue
+                if value.startswith(text) if prefix else text in value:
+                    rows |= self._rows[vid]
+            matched = rows if matched is None else matched & rows
+            if not matched:
+                break
+        return matched
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+
+try:
+    import pyarrow as pa
+except ImportError:  # without pyarrow every load parses the CSV
+    pa = None
+
+from cqvs_memo import file_stamp
+
+# A parsed copy of a source CSV is kept next to it as "<file>.arrow" (Arrow
+# IPC), tagged with the CSV's (mtime, size) and the reader's version. Loads
+# memory-map the sidecar instead of parsing text; a changed CSV or reader
+# is re-parsed once and the sidecar rewritten.
+SIDECAR_SUFFIX = ".arrow"
+_TAG_KEY = b"cqvs_source"
+
+
+def sidecar_path(path):
+    return path + SIDECAR_SUFFIX
+
+
+def _tag(path, version):
+    return json.dumps({"stamp": file_stamp(path), "version": version}).encode()
+
+
+def _read_sidecar(sidecar, tag):
+    try:
+        with pa.memory_map(sidecar) as source:
+            reader = pa.ipc.open_file(source)
+            if (reader.schema.metadata or {}).get(_TAG_KEY) != tag:
+                return None
+            return reader.read_all().to_pandas()
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def _write_sidecar(sidecar, df, tag):
+    tmp = None
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _TAG_KEY: tag})
+        # a temp file of its own, so sessions and processes writing the same sidecar don't clash
+        fd, tmp = tempfile.mkstemp(
+            prefix=os.path.basename(sidecar) + ".", suffix=".tmp", dir=os.path.dirname(sidecar) or "."
+        )
+        os.close(fd)
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, sidecar)
+    except (OSError, pa.ArrowException):
+        # unwritable directory or a column Arrow can't hold; just parse next time too
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def read_with_sidecar(path, read, version=""):
+    """read(path), served from the Arrow sidecar while the CSV is unchanged.
+
+    `version` identifies how read() parses the file (its schema, say), so
+    changing the parsing invalidates old sidecars too.
+    """
+    if pa is None or not os.path.exists(path):
+        return read(path)
+    tag = _tag(path, version)
+    sidecar = sidecar_path(path)
+    df = _read_sidecar(sidecar, tag)
+    if df is None:
+        df = read(path)
+        _write_sidecar(sidecar, df, tag)
+    return df
@@ -0,0 +1,391 @@
+import os
+import sqlite3
+import sys
+import threading
+
+import pandas as pd
+
+from cqvs_aggregates import name_key
+from cqvs_columnar import ID_COLUMN, VERSION_COLUMN, new_id
+from cqvs_schemas import SCHEMAS, check_records
+from cqvs_search import parse_query
+from cqvs_storage import CHANGE_LOG_SIZE, DATA_FILES, WriteConflict, load_records
+
+DB_PATH = os.environ.get("CQVS_DB", "cqvs.db")
+
+# Columns we filter, group or join on; indexed in every table that has them
+INDEXED_COLUMNS = ["Client", "Site", "Status", "Assigned To", "Vehicle ID", "Date"]
+# Stored as ISO dates so MIN/MAX and range filters work on the text
+DATE_COLUMNS = ["Date", "Due"]
+# Declared column type per schema kind (cqvs_schemas.SCHEMAS); everything else is TEXT
+SQL_TYPES = {"number": "REAL", "int": "INTEGER"}
+# Records are addressed by the same string IDs as the CSV backend, held in
+# an "_id" primary key (rowids can be renumbered by VACUUM). Triggers on
+# every entity table log (table, _id) here for changes_since(); the last
+# CHANGE_LOG_SIZE entries are kept.
+CHANGES_TABLE = "_changes"
+
+_local = threading.local()
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def connect(path=None):
+    # One connection per thread: Streamlit runs each session's script in its own thread
+    path = path or DB_PATH
+    conns = _local.__dict__.setdefault("conns", {})
+    if path not in conns:
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # names match across tables the way the CSV backend's key indexes match them
+        conn.create_function("name_key", 1, name_key, deterministic=True)
+        conns[path] = conn
+    return conns[path]
+
+
+def _literal(text):
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def _all_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def table_columns(conn, table):
+    """The table's data columns (without the record ID and version)."""
+    return [c for c in _all_columns(conn, table) if c not in (ID_COLUMN, VERSION_COLUMN)]
+
+
+def _sql_type(table, column):
+    kind = SCHEMAS.get(table, {}).get(column)
+    return SQL_TYPES.get(kind, "TEXT") if isinstance(kind, str) else "TEXT"
+
+
+def _column_def(table, column):
+    return f"{_quote(column)} {_sql_type(table, column)}"
+
+
+def _table_info(conn, table):
+    # column -> (declared type, part of the primary key)
+    return {row[1]: (row[2].upper(), bool(row[5])) for row in conn.execute(f"PRAGMA table_info({_quote(table)})")}
+
+
+_ID_DEF = f"{_quote(ID_COLUMN)} TEXT PRIMARY KEY NOT NULL"
+_VERSION_DEF = f"{_quote(VERSION_COLUMN)} INTEGER NOT NULL DEFAULT 1"
+
+
+def _rebuild(conn, table, columns):
+    # Column types and keys can't be altered in place: copy the rows into a
+    # table declared with the right ones. The declared types convert the
+    # copied values too, so numbers saved as text come back as numbers.
+    # Rows from before record IDs get new ones (same form as new_id()).
+    new = _quote(f"_rebuild_{table}")
+    cols = ", ".join(_quote(c) for c in columns)
+    ids = _quote(ID_COLUMN) if ID_COLUMN in _all_columns(conn, table) else "lower(hex(randomblob(6)))"
+    with conn:
+        conn.execute(f"DROP TABLE IF EXISTS {new}")
+        definitions = [_ID_DEF] + [_column_def(table, c) for c in columns] + [_VERSION_DEF]
+        conn.execute(f"CREATE TABLE {new} ({', '.join(definitions)})")
+        conn.execute(
+            f"INSERT INTO {new} (rowid, {_quote(ID_COLUMN)}, {cols}, {_quote(VERSION_COLUMN)}) "
+            f"SELECT rowid, {ids}, {cols}, {_quote(VERSION_COLUMN)} FROM {_quote(table)}"
+        )
+        conn.execute(f"DROP TABLE {_quote(table)}")
+        conn.execute(f"ALTER TABLE {new} RENAME TO {_quote(table)}")
+
+
+def ensure_table(conn, table, columns):
+    columns = [c for c in columns if c not in (ID_COLUMN, VERSION_COLUMN)]
+    existing = _all_columns(conn, table)
+    version = _VERSION_DEF
+    if not existing:
+        cols = ", ".join([_ID_DEF] + [_column_def(table, c) for c in columns] + [version])
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({cols})")
+        existing = [ID_COLUMN] + list(columns) + [VERSION_COLUMN]
+    if VERSION_COLUMN not in existing:
+        # tables made before record versions: every row starts at 1
+        conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {version}")
+        existing.append(VERSION_COLUMN)
+    for col in columns:
+        if col not in existing:
+            conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_column_def(table, col)}")
+            existing.append(col)
+    info = _table_info(conn, table)
+    data = [c for c in existing if c not in (ID_COLUMN, VERSION_COLUMN)]
+    if info.get(ID_COLUMN) != ("TEXT", True) or any(info[c][0] != _sql_type(table, c) for c in data):
+        # made before record IDs or column types were declared
+        _rebuild(conn, table, data)
+    for col in INDEXED_COLUMNS:
+        if col in existing:
+            index = _quote(f"idx_{table}_{col}")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {_quote(table)} ({_quote(col)})")
+    _ensure_change_log(conn)
+    for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        trigger = _quote(f"log_{table}_{event.lower()}")
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON {_quote(table)} BEGIN "
+            f"INSERT INTO {CHANGES_TABLE} (tbl, row) VALUES ({_literal(table)}, {row}.{_quote(ID_COLUMN)}); END"
+        )
+    return [c for c in existing if c not in (ID_COLUMN, VERSION_COLUMN)]
+
+
+def _ensure_change_log(conn):
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} (seq INTEGER PRIMARY KEY AUTOINCREMENT, tbl, row)")
+
+
+def _trim_change_log(conn):
+    conn.execute(
+        f"DELETE FROM {CHANGES_TABLE} WHERE seq <= (SELECT MAX(seq) FROM {CHANGES_TABLE}) - ?", (CHANGE_LOG_SIZE,)
+    )
+
+
+def _value(value):
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    if not isinstance(value, (int, float, str, bytes)):
+        return str(value)
+    return value
+
+
+def _normalise(table, df):
+    # values arrive as typed in a form; bind numbers as numbers and blanks as NULL
+    for col in df.columns:
+        blank = df[col].isna() | (df[col].astype(str).str.strip() == "")
+        if col in DATE_COLUMNS:
+            parsed = pd.to_datetime(df[col], errors="coerce")
+            df[col] = parsed.dt.strftime("%Y-%m-%d").where(parsed.notna(), df[col])
+        elif _sql_type(table, col) != "TEXT":
+            numbers = pd.to_numeric(df[col], errors="coerce")
+            df[col] = numbers.astype(object).where(numbers.notna(), df[col])
+        df[col] = df[col].astype(object).where(~blank, None)
+    return df
+
+
+def insert(table, records, conn=None, check=True):
+    """Insert records, keeping any _id they carry (an import) and giving the rest new ones.
+
+    Raises cqvs_schemas.InvalidRecord, writing nothing, if one doesn't fit
+    the schema; check=False copies records as they are.
+    """
+    records = list(records)
+    if check:
+        check_records(table, records)
+    df = _normalise(table, pd.DataFrame(records))
+    if df.empty:
+        return
+    ids = df[ID_COLUMN] if ID_COLUMN in df.columns else pd.Series(None, index=df.index, dtype=object)
+    df[ID_COLUMN] = [i if isinstance(i, str) and i else new_id() for i in ids]
+    conn = conn or connect()
+    ensure_table(conn, table, list(df.columns))
+    cols = ", ".join(_quote(c) for c in df.columns)
+    marks = ", ".join("?" for _ in df.columns)
+    rows = ([_value(v) for v in row] for row in df.itertuples(index=False, name=None))
+    with conn:
+        conn.executemany(f"INSERT INTO {_quote(table)} ({cols}) VALUES ({marks})", rows)
+        _trim_change_log(conn)
+
+
+def _ensure_versions(conn, table):
+    columns = _all_columns(conn, table)
+    if columns and (VERSION_COLUMN not in columns or ID_COLUMN not in columns):
+        ensure_table(conn, table, columns)
+
+
+def _versioned(where, params, expected_version):
+    if expected_version is None:
+        return where, params
+    return f"{where} AND {_quote(VERSION_COLUMN)} = ?", params + [int(expected_version)]
+
+
+def _check_written(cursor, table, record_id, expected_version):
+    if cursor.rowcount:
+        return
+    # with an expected version, no row touched means it changed or went away meanwhile
+    if expected_version is not None:
+        raise WriteConflict(f"Record {record_id} in {table} was changed or deleted by someone else")
+    raise KeyError(f"No record {record_id} in {table}")
+
+
+def _by_id(record_id, expected_version):
+    return _versioned(f"{_quote(ID_COLUMN)} = ?", [str(record_id)], expected_version)
+
+
+def update(table, record_id, record, expected_version=None, conn=None):
+    """Overwrite one record and bump its version; with `expected_version`, only if it is still current."""
+    record = {k: v for k, v in record.items() if k not in (ID_COLUMN, VERSION_COLUMN)}
+    check_records(table, [record])
+    df = _normalise(table, pd.DataFrame([record]))
+    conn = conn or connect()
+    ensure_table(conn, table, list(df.columns))
+    version = _quote(VERSION_COLUMN)
+    sets = ", ".join([f"{_quote(c)} = ?" for c in df.columns] + [f"{version} = {version} + 1"])
+    where, params = _by_id(record_id, expected_version)
+    values = [_value(v) for v in df.iloc[0]]
+    with conn:
+        cursor = conn.execute(f"UPDATE {_quote(table)} SET {sets} WHERE {where}", values + params)
+        _check_written(cursor, table, record_id, expected_version)
+        _trim_change_log(conn)
+
+
+def delete(table, record_id, expected_version=None, conn=None):
+    conn = conn or connect()
+    _ensure_versions(conn, table)
+    where, params = _by_id(record_id, expected_version)
+    with conn:
+        cursor = conn.execute(f"DELETE FROM {_quote(table)} WHERE {where}", params)
+        _check_written(cursor, table, record_id, expected_version)
+        _trim_change_log(conn)
+
+
+def record_version(table, record_id, conn=None):
+    conn = conn or connect()
+    _ensure_versions(conn, table)
+    where, params = _by_id(record_id, None)
+    row = conn.execute(f"SELECT {_quote(VERSION_COLUMN)} FROM {_quote(table)} WHERE {where}", params).fetchone()
+    if row is None:
+        raise KeyError(f"No record {record_id} in {table}")
+    return row[0]
+
+
+def changes_since(table, since, conn=None):
+    """(latest change number, IDs of `table` records changed after `since`), like SharedTable.changes_since."""
+    conn = conn or connect()
+    _ensure_change_log(conn)
+    first, last = conn.execute(f"SELECT MIN(seq), MAX(seq) FROM {CHANGES_TABLE}").fetchone()
+    last = last or 0
+    if since is None or (first is not None and since < first - 1):
+        return last, None
+    rows = conn.execute(f"SELECT DISTINCT row FROM {CHANGES_TABLE} WHERE tbl = ? AND seq > ?", (table, since))
+    return last, {row[0] for row in rows}
+
+
+def _where(columns, filter_text):
+    # Same query syntax as the in-memory index; LIKE is case-insensitive for ASCII
+    clauses, params = [], []
+    for column, text, prefix in parse_query(filter_text, columns):
+        escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"{escaped}%" if prefix else f"%{escaped}%"
+        cols = [column] if column is not None else columns
+        likes = " OR ".join(f"CAST({_quote(c)} AS TEXT) LIKE ? ESCAPE '\\'" for c in cols)
+        clauses.append(f"({likes})")
+        params += [pattern] * len(cols)
+    if not clauses:
+        return "", []
+    return " WHERE " + " AND ".join(clauses), params
+
+
+def query(table, filter_text="", limit=None, offset=0, sort_by=None, descending=False, conn=None):
+    """Rows of `table` matching `filter_text`, indexed by record ID, in insertion order unless sorted."""
+    conn = conn or connect()
+    _ensure_versions(conn, table)
+    columns = table_columns(conn, table)
+    if not columns:
+        return pd.DataFrame()
+    where, params = _where(columns, filter_text)
+    cols = ", ".join(_quote(c) for c in columns)
+    order = "rowid"
+    if sort_by in columns:
+        direction = "DESC" if descending else "ASC"
+        order = f"{_quote(sort_by)} IS NULL, {_quote(sort_by)} {direction}, rowid"
+    sql = f"SELECT {_quote(ID_COLUMN)}, {cols} FROM {_quote(table)}{where} ORDER BY {order}"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [int(limit), int(offset)]
+    df = pd.read_sql_query(sql, conn, params=params)
+    return df.set_index(ID_COLUMN).rename_axis(None)
+
+
+def ids_where(table, column, key, conn=None):
+    """IDs of the `table` records whose `column` has name_key() `key`."""
+    conn = conn or connect()
+    if key is None or column not in table_columns(conn, table):
+        return frozenset()
+    rows = conn.execute(
+        f"SELECT {_quote(ID_COLUMN)} FROM {_quote(table)} WHERE name_key({_quote(column)}) = ?", (key,)
+    )
+    return frozenset(row[0] for row in rows)
+
+
+def records(table, ids, conn=None):
+    """The `table` records with these IDs, indexed by ID, in insertion order."""
+    conn = conn or connect()
+    columns = table_columns(conn, table)
+    if not columns:
+        return pd.DataFrame()
+    ids = [str(i) for i in ids]
+    cols = ", ".join(_quote(c) for c in columns)
+    frames = []
+    # in batches, under SQLite's limit on bound parameters
+    for batch in [ids[i:i + 500] for i in range(0, len(ids), 500)] or [[]]:
+        marks = ", ".join("?" for _ in batch)
+        frames.append(pd.read_sql_query(
+            f"SELECT rowid AS _rowid, {_quote(ID_COLUMN)}, {cols} FROM {_quote(table)} "
+            f"WHERE {_quote(ID_COLUMN)} IN ({marks})", conn, params=batch,
+        ))
+    df = pd.concat(frames, ignore_index=True).sort_values("_rowid", kind="stable")
+    return df.drop(columns="_rowid").set_index(ID_COLUMN).rename_axis(None)
+
+
+def count(table, filter_text="", conn=None):
+    conn = conn or connect()
+    columns = table_columns(conn, table)
+    if not columns:
+        return 0
+    where, params = _where(columns, filter_text)
+    return conn.execute(f"SELECT COUNT(*) FROM {_quote(table)}{where}", params).fetchone()[0]
+
+
+def value_counts(table, column, conn=None):
+    conn = conn or connect()
+    if column not in table_columns(conn, table):
+        return {}
+    col = _quote(column)
+    rows = conn.execute(
+        f"SELECT {col}, COUNT(*) AS n FROM {_quote(table)} WHERE {col} IS NOT NULL "
+        f"GROUP BY {col} ORDER BY n DESC"
+    )
+    return dict(rows.fetchall())
+
+
+def distinct(table, column, conn=None):
+    conn = conn or connect()
+    if column not in table_columns(conn, table):
+        return set()
+    col = _quote(column)
+    rows = conn.execute(f"SELECT DISTINCT TRIM(CAST({col} AS TEXT)) FROM {_quote(table)} WHERE {col} IS NOT NULL")
+    return {row[0] for row in rows}
+
+
+def column_stats(table, column, conn=None):
+    """(min, max, sum, non-null count) of one column, or None if it doesn't exist."""
+    conn = conn or connect()
+    if column not in table_columns(conn, table):
+        return None
+    col = _quote(column)
+    return conn.execute(
+        f"SELECT MIN({col}), MAX({col}), SUM({col}), COUNT({col}) FROM {_quote(table)}"
+    ).fetchone()
+
+
+def import_csvs(data_files=DATA_FILES, path=None):
+    """One-shot import of the CSV (+ journal) data into SQLite, replacing existing tables."""
+    conn = connect(path)
+    for table, filename in data_files.items():
+        # record IDs and versions carry over, so a record is the same one on either backend
+        records = load_records(filename).ordered_frame().to_dict("records")
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+        # copied as stored, so older records that predate the schema still come across
+        insert(table, records, conn=conn, check=False)
+        print(f"{table}: {len(records)} rows from {filename}")
+
+
+if __name__ == "__main__":
+    # python cqvs_sqlite.py [path/to/cqvs.db]
+    import_csvs(path=sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,369 @@
+import hashlib
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialised within one process
+    fcntl = None
+
+import pandas as pd
+
+from cqvs_columnar import ID_COLUMN, ColumnStore, new_id
+from cqvs_schemas import SCHEMAS
+from cqvs_snapshot import read_with_sidecar
+
+DATA_FILES = {
+    "sites": "sites.csv",
+    "contacts": "contacts.csv",
+    "clients": "clients.csv",
+    "jobs": "jobs.csv",
+    "tasks": "tasks.csv",
+    "refills": "refills.csv",
+    "vehicles": "vehicles.csv"
+}
+
+# Each entity CSV is a compacted snapshot; every change since the last
+# compaction is appended to "<file>.journal" as one JSON line:
+#   {"op": "insert", "records": [{"_id": "...", ...}]}
+#   {"op": "update", "id": "...", "record": {...}}
+#   {"op": "delete", "id": "..."}
+# Loading replays the journal over the snapshot, so a save costs O(change):
+# one fsynced append. Snapshots are written and fsynced in full, then swapped
+# in with os.replace; a journal is only removed once that is on disk.
+JOURNAL_SUFFIX = ".journal"
+COMPACTING_SUFFIX = ".journal.compacting"
+# Written by a compaction just before it swaps in the new snapshot: the size
+# and hash of the rotated journal it folded and of the snapshot it wrote, so a
+# rotated journal left behind by a crash is known to be folded already.
+FOLDED_SUFFIX = ".folded"
+COMPACT_BYTES = 1024 * 1024  # rotate + compact once the journal passes 1 MB
+# Writers take an exclusive flock on "<file>.lock", so processes sharing the
+# data directory append and compact one at a time.
+LOCK_SUFFIX = ".lock"
+# Recent changes each table remembers for changes_since() (cqvs_cache.py)
+CHANGE_LOG_SIZE = 10_000
+
+
+class WriteConflict(Exception):
+    """A write made against a record version that is no longer current."""
+
+
+class _FileLock:
+    # Re-entrant within a thread; the flock is held while the outermost holder is inside.
+    def __init__(self, filename):
+        self.path = filename + LOCK_SUFFIX
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fh = None
+
+    def acquire(self, blocking=True):
+        """Take the lock; with blocking=False, return False at once if someone else holds it."""
+        if not self._lock.acquire(blocking):
+            return False
+        if self._depth == 0 and fcntl is not None:
+            try:
+                self._fh = open(self.path, "a")
+                fcntl.flock(self._fh, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._fh.close()
+                self._fh = None
+                self._lock.release()
+                return False
+            except OSError:
+                # read-only data directory: nothing can write there anyway
+                if self._fh is not None:
+                    self._fh.close()
+                self._fh = None
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._fh is not None:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+            self._fh.close()
+            self._fh = None
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def file_lock(filename):
+    """The lock guarding an entity's snapshot and journals, across threads and processes."""
+    with _locks_guard:
+        key = os.path.abspath(filename)
+        if key not in _locks:
+            _locks[key] = _FileLock(key)
+        return _locks[key]
+
+
+def _json_default(value):
+    # numpy scalars coming out of read_csv
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def apply_change(store, entry):
+    # replaying an entry that is already applied changes nothing
+    op = entry["op"]
+    if op == "insert":
+        store.extend(r for r in entry["records"] if r.get(ID_COLUMN) not in store)
+    elif op == "update":
+        store[entry["id"]] = entry["record"]
+    elif op == "delete":
+        if entry["id"] in store:
+            store.pop(entry["id"])
+    else:
+        raise ValueError(f"Unknown journal op: {op}")
+
+
+def _read_journal(path):
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                # torn write from a crash; everything after it is unusable
+                break
+    return entries
+
+
+def read_journal_from(filename, offset):
+    """Entries appended to the journal since byte `offset`, and the offset after them.
+
+    A line still being written is left for the next call.
+    """
+    with open(filename + JOURNAL_SUFFIX, "rb") as fh:
+        fh.seek(offset)
+        data = fh.read()
+    end = data.rfind(b"\n") + 1
+    entries = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+    return entries, offset + end
+
+
+def entity_of(filename):
+    """The entity stored in `filename`, or None for a file outside DATA_FILES."""
+    name = os.path.basename(filename)
+    return next((entity for entity, data_file in DATA_FILES.items() if os.path.basename(data_file) == name), None)
+
+
+def _schema(filename):
+    return SCHEMAS.get(entity_of(filename), {})
+
+
+def _read_snapshot(filename):
+    if os.path.exists(filename) and os.path.getsize(filename) > 0:
+        # text columns stay text (an ABN or phone number isn't a number);
+        # the ColumnStore converts the typed ones
+        text = {c: str for c, kind in _schema(filename).items() if kind == "text"}
+        dtype = {**text, ID_COLUMN: str}
+        return read_with_sidecar(filename, lambda path: pd.read_csv(path, dtype=dtype), repr(dtype))
+    return pd.DataFrame()
+
+
+def _fsync_dir(path):
+    # makes a rename or removal in path's directory durable
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:  # Windows can't open a directory; its renames are durable anyway
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_fsynced(path, df):
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        df.to_csv(fh, index=False)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def _swap_in(tmp, filename):
+    os.replace(tmp, filename)
+    _fsync_dir(filename)
+
+
+def _write_snapshot(filename, df):
+    tmp = filename + ".tmp"
+    _write_fsynced(tmp, df)
+    _swap_in(tmp, filename)
+
+
+def _remove(*paths):
+    removed = [path for path in paths if os.path.exists(path)]
+    for path in removed:
+        os.remove(path)
+    if removed:
+        _fsync_dir(removed[0])
+
+
+def _identity(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return [os.path.getsize(path), digest.hexdigest()]
+
+
+def _is(path, identity):
+    # the size first, so a mismatch rarely costs a hash
+    return isinstance(identity, list) and os.path.getsize(path) == identity[0] and _identity(path) == identity
+
+
+def _write_folded(filename, rotated, snapshot):
+    tmp = filename + FOLDED_SUFFIX + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"journal": _identity(rotated), "snapshot": _identity(snapshot)}, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    _swap_in(tmp, filename + FOLDED_SUFFIX)
+
+
+def _discard_stale_compacting(filename):
+    # A compaction that replaced the CSV but died before removing its rotated
+    # journal leaves a file that is already folded into the snapshot.
+    rotated = filename + COMPACTING_SUFFIX
+    marker = filename + FOLDED_SUFFIX
+    if not (os.path.exists(rotated) and os.path.exists(marker) and os.path.exists(filename)):
+        return
+    try:
+        with open(marker, encoding="utf-8") as fh:
+            folded = json.load(fh)
+    except (OSError, ValueError):
+        return
+    if _is(filename, folded.get("snapshot")) and _is(rotated, folded.get("journal")):
+        _remove(rotated)
+
+
+def _needs_ids(snapshot, entries):
+    if any("index" in entry for entry in entries):
+        return True
+    if snapshot.empty:
+        return False
+    return ID_COLUMN not in snapshot.columns or snapshot[ID_COLUMN].isna().any()
+
+
+def _migrate(filename, snapshot, entries):
+    """Give every record an ID and fold the journals into the CSV.
+
+    Files written before record IDs have no ID column and journals that
+    address rows by list position, so they are replayed on a plain list.
+    """
+    records = snapshot.to_dict("records")
+    for entry in entries:
+        op = entry["op"]
+        if op == "insert":
+            records.extend(entry["records"])
+            continue
+        if "index" in entry:
+            i = entry["index"]
+        else:
+            i = next(n for n, r in enumerate(records) if r.get(ID_COLUMN) == entry["id"])
+        if op == "update":
+            records[i] = dict(entry["record"], **{ID_COLUMN: records[i].get(ID_COLUMN)})
+        else:
+            records.pop(i)
+    df = pd.DataFrame(records)
+    if ID_COLUMN not in df.columns:
+        df.insert(0, ID_COLUMN, None)
+    # an all-missing ID column comes out as floats, so map rather than assign into it
+    df[ID_COLUMN] = df[ID_COLUMN].map(lambda v: v if isinstance(v, str) else new_id()).astype(object)
+    df = df[[ID_COLUMN] + [c for c in df.columns if c != ID_COLUMN]]
+    _write_snapshot(filename, df)
+    _remove(filename + COMPACTING_SUFFIX, filename + JOURNAL_SUFFIX)
+    return df
+
+
+def load_records(filename):
+    """The entity as a ColumnStore: CSV snapshot plus journal replay."""
+    return load_table(filename)[0]
+
+
+def load_table(filename):
+    """(ColumnStore, journal offset): the loaded entity and how far into the journal it reaches."""
+    with file_lock(filename):
+        _discard_stale_compacting(filename)
+        snapshot = _read_snapshot(filename)
+        entries = _read_journal(filename + COMPACTING_SUFFIX) + _read_journal(filename + JOURNAL_SUFFIX)
+        if _needs_ids(snapshot, entries):
+            return ColumnStore.from_frame(_migrate(filename, snapshot, entries), _schema(filename)), 0
+        store = ColumnStore.from_frame(snapshot, _schema(filename))
+        for entry in entries:
+            apply_change(store, entry)
+        journal = filename + JOURNAL_SUFFIX
+        offset = os.path.getsize(journal) if os.path.exists(journal) else 0
+    return store, offset
+
+
+def append_change(filename, op, **change):
+    """Append one entry to the journal; returns the journal's size after it."""
+    entry = {"op": op, **change}
+    line = json.dumps(entry, default=_json_default) + "\n"
+    path = filename + JOURNAL_SUFFIX
+    with file_lock(filename):
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+            fh.flush()
+            os.fsync(fh.fileno())
+        size = os.path.getsize(path)
+    if size > COMPACT_BYTES:
+        compact_in_background(filename)
+    return size
+
+
+def compact(filename):
+    """Fold the journal into the CSV snapshot and start a fresh journal.
+
+    One compaction runs at a time. A rotated journal left behind by one that
+    died is folded in by the next, rather than blocking compaction for good.
+    """
+    path = filename + JOURNAL_SUFFIX
+    rotated = filename + COMPACTING_SUFFIX
+    compacting = file_lock(rotated)
+    if not compacting.acquire(blocking=False):
+        return
+    try:
+        with file_lock(filename):
+            _discard_stale_compacting(filename)
+            if not os.path.exists(rotated):
+                if not os.path.exists(path):
+                    return
+                # New writes go to a fresh journal while the rotated one is folded in.
+                os.replace(path, rotated)
+                _fsync_dir(rotated)
+
+        store = ColumnStore.from_frame(_read_snapshot(filename), _schema(filename))
+        for entry in _read_journal(rotated):
+            apply_change(store, entry)
+        tmp = filename + ".compact.tmp"
+        _write_fsynced(tmp, store.ordered_frame())
+        with file_lock(filename):
+            _write_folded(filename, rotated, tmp)
+            _swap_in(tmp, filename)
+            _remove(rotated)
+    finally:
+        compacting.release()
+
+
+def compact_in_background(filename):
+    threading.Thread(target=compact, args=(filename,), daemon=True).start()
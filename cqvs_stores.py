@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+
+import cqvs_sqlite
+from cqvs_aggregates import name_key
+from cqvs_cache import shared_table
+from cqvs_forecast import site_stats
+from cqvs_storage import DATA_FILES
+
+# The entity tables behind the pages, the alerts, the rollups, the scheduler
+# and ingest, so they all read and write the same data whichever backend is
+# configured. Both stores take an entity key ("jobs", "refills", ...) and
+# address records by the same string IDs. Besides the page queries:
+#   table_version(key)            changes whenever the table may have
+#   ids_where(key, column, name)  IDs of the records whose column holds name, matched by name_key()
+#   records(key, ids)             those records, in table order
+#
+# "csv" (journaled CSV files, the default) or "sqlite" (see cqvs_sqlite.py)
+BACKEND = os.environ.get("CQVS_BACKEND", "csv")
+
+
+class CsvStore:
+    """Journaled CSV files, held once per process and shared by every session."""
+
+    def _table(self, key):
+        return shared_table(DATA_FILES[key])
+
+    def _frame(self, key):
+        return self._table(key).frame()
+
+    def columns(self, key):
+        return list(self._frame(key).columns)
+
+    def frame(self, key, filter_text="", limit=None, offset=0, sort_by=None, descending=False):
+        table = self._table(key)
+        df = table.frame()
+        if df.empty:
+            return df
+        order = table.order(sort_by, descending)
+        if filter_text:
+            keep = np.zeros(len(df), dtype=bool)
+            keep[table.search(filter_text)] = True
+            order = order[keep[order]]
+        if limit is not None:
+            order = order[offset:offset + limit]
+        # only the requested slice is materialised; its index is the record IDs
+        return df.iloc[order]
+
+    def count(self, key, filter_text=""):
+        if filter_text:
+            return len(self._table(key).search(filter_text))
+        return len(self._table(key))
+
+    def insert(self, key, records):
+        self._table(key).apply("insert", records=list(records))
+
+    def update(self, key, record_id, record, expected_version=None):
+        self._table(key).apply("update", expected_version, id=record_id, record=record)
+
+    def delete(self, key, record_id, expected_version=None):
+        self._table(key).apply("delete", expected_version, id=record_id)
+
+    def version(self, key, record_id):
+        return self._table(key).record_version(record_id)
+
+    def changes_since(self, key, since):
+        return self._table(key).changes_since(since)
+
+    def table_version(self, key):
+        return self._table(key).refresh()
+
+    def ids_where(self, key, column, name):
+        return self._table(key).aggregate("key_index", column).get(name_key(name), frozenset())
+
+    def records(self, key, ids):
+        df = self._frame(key)
+        positions = df.index.get_indexer(list(ids))
+        return df.iloc[np.sort(positions[positions >= 0])]
+
+    def value_counts(self, key, column):
+        return self._table(key).aggregate("count_by", column)
+
+    def column_stats(self, key, column):
+        if column not in self._frame(key).columns:
+            return None
+        kind = "date_summary" if column in cqvs_sqlite.DATE_COLUMNS else "summary"
+        return self._table(key).aggregate(kind, column)
+
+    def distinct(self, key, column):
+        df = self._frame(key)
+        if column not in df.columns:
+            return set()
+        return set(df[column].dropna().astype(str).str.strip())
+
+    def forecast_stats(self, key, method):
+        return self._table(key).aggregate("refill_forecast", method)
+
+
+class SqliteStore:
+    """Entity tables in SQLite; views fetch only the rows they show. Record IDs are the same as in the CSVs."""
+
+    def columns(self, key):
+        return cqvs_sqlite.table_columns(cqvs_sqlite.connect(), key)
+
+    def frame(self, key, filter_text="", limit=None, offset=0, sort_by=None, descending=False):
+        return cqvs_sqlite.query(key, filter_text, limit=limit, offset=offset, sort_by=sort_by, descending=descending)
+
+    def count(self, key, filter_text=""):
+        return cqvs_sqlite.count(key, filter_text)
+
+    def insert(self, key, records):
+        cqvs_sqlite.insert(key, records)
+
+    def update(self, key, record_id, record, expected_version=None):
+        cqvs_sqlite.update(key, record_id, record, expected_version)
+
+    def delete(self, key, record_id, expected_version=None):
+        cqvs_sqlite.delete(key, record_id, expected_version)
+
+    def version(self, key, record_id):
+        return cqvs_sqlite.record_version(key, record_id)
+
+    def changes_since(self, key, since):
+        return cqvs_sqlite.changes_since(key, since)
+
+    def table_version(self, key):
+        # the database's latest change number: it moves with every table, which only costs a recompute
+        return cqvs_sqlite.changes_since(key, None)[0]
+
+    def ids_where(self, key, column, name):
+        return cqvs_sqlite.ids_where(key, column, name_key(name))
+
+    def records(self, key, ids):
+        return cqvs_sqlite.records(key, ids)
+
+    def value_counts(self, key, column):
+        return cqvs_sqlite.value_counts(key, column)
+
+    def column_stats(self, key, column):
+        return cqvs_sqlite.column_stats(key, column)
+
+    def distinct(self, key, column):
+        return cqvs_sqlite.distinct(key, column)
+
+    def forecast_stats(self, key, method):
+        return site_stats(cqvs_sqlite.query(key), method)
+
+
+store = SqliteStore() if BACKEND == "sqlite" else CsvStore()
@@ -0,0 +1,178 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from cqvs_aggregates import name_key
+from cqvs_memo import file_stamp, memoize
+from cqvs_scans import scan_log
+from cqvs_stores import store
+
+SCANS_FILE = "Scans data - Sheet1.csv"
+WASH_WINDOWS = [5, 7, 30, 60, 90, 180, 365]
+DEFAULT_WASH_INTERVAL_DAYS = 7.0
+# how stale current_wash_metrics() may get while the scan log doesn't change
+WASH_REFRESH = "5min"
+
+WASH_COLUMNS = ["Vehicle", "Time Range (days)", "Washes", "Avg Washes", "Missed Washes", "Success Score"]
+# vehicles column overriding DEFAULT_WASH_INTERVAL_DAYS for one vehicle
+INTERVAL_COLUMN = "Wash Interval (days)"
+
+
+def empty_wash_metrics():
+    """A wash_metrics() frame with no rows, typed like a full one."""
+    return pd.DataFrame({
+        "Vehicle": pd.Series(dtype=object),
+        "Time Range (days)": pd.Series(dtype="int64"),
+        "Washes": pd.Series(dtype="int64"),
+        "Avg Washes": pd.Series(dtype=float),
+        "Missed Washes": pd.Series(dtype="int64"),
+        "Success Score": pd.Series(dtype="int64"),
+    })
+
+
+def _window_counts(groups, bins, n_groups, n_windows):
+    # bins[i] is the smallest window holding item i (n_windows = none of them);
+    # count per (group, bin) and cumulate so column w counts everything in window w
+    flat = np.bincount(groups * (n_windows + 1) + bins, minlength=n_groups * (n_windows + 1))
+    return flat.reshape(n_groups, n_windows + 1)[:, :n_windows].cumsum(axis=1)
+
+
+def wash_metrics(scans, now=None, windows=WASH_WINDOWS, intervals=None, first_seen=None):
+    """Wash metrics for every vehicle and every window, computed in one grouped pass.
+
+    Each window (in days, counted back from `now`) is split into schedule
+    slots of the vehicle's expected wash interval: `intervals` maps Vehicle
+    Name to days between washes, DEFAULT_WASH_INTERVAL_DAYS otherwise. A
+    slot with no scan is a missed wash, and slots from before a vehicle's
+    first scan don't count. A window shorter than the interval is scored
+    over one interval, so it still expects a wash. Success Score is the
+    share of slots with a wash, out of 100; Avg Washes is washes per week
+    over the window.
+
+    `first_seen` (Vehicle Name -> earliest scan) lets `scans` hold just the
+    scans inside the longest window: it gives each vehicle's start, and
+    brings in vehicles with no recent scans.
+
+    Returns one row per (vehicle, window) with WASH_COLUMNS.
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    windows = np.asarray(sorted(windows), dtype=float)
+    n_windows = len(windows)
+
+    created = pd.to_datetime(scans["Created"], errors="coerce")
+    valid = created.notna() & scans["Vehicle Name"].notna() & (created <= now)
+    if first_seen is None:
+        vehicle_codes, vehicles = pd.factorize(scans.loc[valid, "Vehicle Name"])
+    else:
+        first_seen = first_seen[first_seen <= now]
+        vehicles = first_seen.index
+        vehicle_codes = vehicles.get_indexer(scans.loc[valid, "Vehicle Name"].astype(object))
+    n_vehicles = len(vehicles)
+    if not n_vehicles:
+        return empty_wash_metrics()
+    age = ((now - created[valid]).dt.total_seconds() / 86400).to_numpy()
+
+    interval = np.full(n_vehicles, DEFAULT_WASH_INTERVAL_DAYS)
+    if intervals is not None:
+        mapped = pd.Series(vehicles).map(pd.Series(intervals, dtype=float))
+        interval = mapped.fillna(DEFAULT_WASH_INTERVAL_DAYS).to_numpy(dtype=float)
+    # how long each vehicle has been washing, from its oldest scan
+    active = np.zeros(n_vehicles)
+    if first_seen is not None:
+        active = ((now - first_seen).dt.total_seconds() / 86400).to_numpy()
+    np.maximum.at(active, vehicle_codes, age)
+
+    # a scan is in window w when its age is under windows[w]
+    washes = _window_counts(vehicle_codes, np.searchsorted(windows, age, side="right"), n_vehicles, n_windows)
+
+    # distinct (vehicle, slot) pairs that had at least one wash
+    slot = np.floor(age / interval[vehicle_codes]).astype(np.int64)
+    stride = int(slot.max()) + 1 if len(slot) else 1
+    pairs = np.unique(vehicle_codes.astype(np.int64) * stride + slot)
+    pair_vehicle, pair_slot = pairs // stride, pairs % stride
+    # a slot counts once a window covers all of it, and only if the vehicle was active for all of it
+    reach = (pair_slot + 1) * interval[pair_vehicle]
+    counted = reach <= active[pair_vehicle]
+    covered = _window_counts(
+        pair_vehicle[counted], np.searchsorted(windows, reach[counted], side="left"), n_vehicles, n_windows
+    )
+    # windows shorter than a vehicle's interval are scored on its latest slot
+    short = windows[None, :] < interval[:, None]
+    latest = np.bincount(pair_vehicle[counted & (pair_slot == 0)], minlength=n_vehicles)
+    covered = np.where(short, latest[:, None], covered)
+
+    span = np.maximum(windows[None, :], interval[:, None])
+    slots = np.floor(np.minimum(span, active[:, None]) / interval[:, None])
+    missed = np.maximum(slots - covered, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(slots > 0, 100 * covered / slots, 100.0)
+
+    return pd.DataFrame({
+        "Vehicle": np.repeat(np.asarray(vehicles, dtype=object), n_windows),
+        "Time Range (days)": np.tile(windows.astype(int), n_vehicles),
+        "Washes": washes.ravel(),
+        "Avg Washes": (washes / (windows / 7)).round(1).ravel(),
+        "Missed Washes": missed.astype(int).ravel(),
+        "Success Score": score.round().astype(int).ravel(),
+    })
+
+
+@memoize(paths=("path",))
+def scan_vehicle_ids(path):
+    """Vehicle Name -> the Vehicle ID on its latest scan that has one."""
+    scans = scan_log(path).snapshot()[0]
+    if "Vehicle ID" not in scans.columns:
+        return {}
+    pairs = scans[["Vehicle Name", "Vehicle ID"]].dropna().astype(object)
+    pairs = pairs.drop_duplicates("Vehicle Name", keep="last")
+    return dict(zip(pairs["Vehicle Name"], pairs["Vehicle ID"]))
+
+
+def wash_intervals(path=SCANS_FILE):
+    """Vehicle Name -> wash interval in days, for the vehicles records that set INTERVAL_COLUMN.
+
+    Scanned vehicles are matched to their records by Vehicle ID.
+    """
+    vehicles = store.frame("vehicles")
+    if INTERVAL_COLUMN not in vehicles.columns or not os.path.exists(path):
+        return {}
+    days = pd.to_numeric(vehicles[INTERVAL_COLUMN], errors="coerce")
+    days = days[days > 0]
+    by_id = dict(zip(vehicles.loc[days.index, "Vehicle ID"].map(name_key), days))
+    by_id.pop(None, None)
+    intervals = {}
+    for vehicle, vehicle_id in scan_vehicle_ids(path).items():
+        interval = by_id.get(name_key(vehicle_id))
+        if interval is not None:
+            intervals[vehicle] = float(interval)
+    return intervals
+
+
+def wash_version(path=SCANS_FILE, now=None):
+    """Changes whenever current_wash_metrics() may: with the scan log, vehicles and every WASH_REFRESH."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    return file_stamp(path), now.floor(WASH_REFRESH), store.table_version("vehicles")
+
+
+@memoize(paths=("path",))
+def _wash_metrics_as_of(path, as_of, intervals):
+    if not os.path.exists(path):
+        return empty_wash_metrics()
+    scans, scan_index = scan_log(path).snapshot()
+    # with each vehicle's first scan known, only the longest window's scans matter
+    rows = scan_index.rows(None, as_of - pd.Timedelta(days=max(WASH_WINDOWS)), as_of)
+    return wash_metrics(
+        scans.iloc[rows[rows < len(scans)]], now=as_of, intervals=intervals, first_seen=scan_index.first_seen()
+    )
+
+
+def current_wash_metrics(path=SCANS_FILE, now=None):
+    """wash_metrics() of the scan log with wash_intervals(), recomputed when the file or vehicles
+    change or WASH_REFRESH passes."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    return _wash_metrics_as_of(path, now.floor(WASH_REFRESH), wash_intervals(path))
+
+
+def score_badge(score):
+    return "🟢" if score >= 80 else "🟠" if score >= 60 else "🔴"
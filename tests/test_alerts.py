@@ -0,0 +1,67 @@
+import pandas as pd
+
+from cqvs_alerts import Rule, evaluate, missed_washes, refill_overdue, task_overdue
+
+
+def _wash(missed):
+    windows = [5, 7, 30, 60, 90, 180, 365]
+    return pd.DataFrame({
+        "Vehicle": ["Truck 1"] * len(windows),
+        "Time Range (days)": windows,
+        "Missed Washes": [min(m, missed) for m in [0, 0, 2, 2, 2, 2, 2]],
+    })
+
+
+def test_missed_washes_alert_once_per_vehicle():
+    alerts = evaluate([missed_washes(1)], {"wash": _wash(2)})
+
+    assert list(alerts["Message"]) == ["Truck 1 missed 2 washes in last 30 days"]
+
+
+def test_missed_washes_below_threshold_raise_nothing():
+    assert evaluate([missed_washes(1)], {"wash": _wash(1)}).empty
+
+
+def test_overdue_task_message_shows_the_day():
+    tasks = pd.DataFrame({
+        "Task": ["Service pump", "Order chemicals", "Clean bay"],
+        "Due": pd.to_datetime(["2025-06-24", "2025-06-01", "2025-07-10"]),
+        "Status": ["Open", "Done", "Open"],
+    })
+
+    alerts = evaluate([task_overdue()], {"tasks": tasks}, now="2025-07-01 09:30")
+
+    assert list(alerts["Message"]) == ["Service pump was due 2025-06-24"]
+
+
+def test_refill_overdue_is_relative_to_the_gap_and_sorted_first():
+    refills = pd.DataFrame({
+        "Site": ["Depot", "Yard", "Shed"],
+        "Days Since Last": [13, 12, 30],
+        "Avg Refill Gap (days)": [10.0, 10.0, None],
+    })
+
+    alerts = evaluate([task_overdue(), refill_overdue(25)], {
+        "refills": refills,
+        "tasks": pd.DataFrame({"Task": ["Clean bay"], "Due": ["2025-06-01"], "Status": ["Open"]}),
+    }, now="2025-07-01")
+
+    assert list(alerts["Rule"]) == ["refill_overdue", "task_overdue"]
+    assert list(alerts["Severity"]) == ["error", "warning"]
+    assert alerts["Message"][0] == "Depot: Refill overdue (13 days since last refill)"
+
+
+def test_duplicated_rows_alert_once():
+    rule = Rule("low", "tanks", "Litres", "<", 100, "{Tank} is low", subject="Tank")
+    tanks = pd.DataFrame({"Tank": ["A", "A", "B", "C"], "Litres": [50, 50, "n/a", 500]})
+
+    alerts = evaluate([rule, rule], {"tanks": tanks})
+
+    assert list(alerts["Subject"]) == ["A"]
+
+
+def test_rules_over_missing_sources_or_columns_raise_nothing():
+    rule = Rule("low", "tanks", "Litres", "<", 100, "{Tank} is low", subject="Tank")
+
+    assert evaluate([rule], {}).empty
+    assert evaluate([rule], {"tanks": pd.DataFrame({"Tank": ["A"]})}).empty
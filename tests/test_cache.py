@@ -0,0 +1,106 @@
+import os
+
+import pandas as pd
+import pytest
+
+from cqvs_aggregates import AGGREGATES
+from cqvs_cache import SharedTable
+from cqvs_schemas import InvalidRecord
+from cqvs_storage import JOURNAL_SUFFIX, WriteConflict
+
+
+@pytest.fixture
+def jobs(data_dir):
+    (data_dir / "jobs.csv").write_text("Job Number,Client,Status\nJ1,Acme,Quote\n")
+    return SharedTable("jobs.csv")
+
+
+@pytest.mark.parametrize("record, problem", [
+    ({"Job Number": "", "Status": "Quote"}, "missing Job Number"),
+    ({"Client": "Acme"}, "missing Job Number"),
+    ({"Job Number": "J2", "Status": "Maybe"}, "Status must be one of"),
+])
+def test_insert_must_fit_schema(jobs, record, problem):
+    with pytest.raises(InvalidRecord, match=problem):
+        jobs.apply("insert", records=[record])
+    assert len(jobs) == 1
+    assert not os.path.exists("jobs.csv" + JOURNAL_SUFFIX)
+
+
+def test_update_with_bad_number_keeps_the_record(data_dir):
+    (data_dir / "refills.csv").write_text("Site,Date,Litres,Cost\nDepot,2026-01-02,120,50\n")
+    refills = SharedTable("refills.csv")
+    record_id = refills.frame().index[0]
+
+    with pytest.raises(InvalidRecord, match="bad number in Litres"):
+        refills.apply("update", id=record_id, record={"Site": "Depot", "Date": "2026-01-02", "Litres": "12O"})
+    with pytest.raises(InvalidRecord, match="bad date in Date"):
+        refills.apply("update", id=record_id, record={"Site": "Depot", "Date": "someday", "Litres": "120"})
+
+    assert refills.frame().loc[record_id, "Litres"] == 120
+
+
+def test_stale_update_is_a_conflict(jobs):
+    record_id = jobs.frame().index[0]
+    seen = jobs.record_version(record_id)
+    # another process edits the record through its own copy of the table
+    other = SharedTable("jobs.csv")
+    other.apply("update", expected_version=seen, id=record_id, record={"Job Number": "J1", "Status": "Scheduled"})
+
+    with pytest.raises(WriteConflict, match="changed by someone else"):
+        jobs.apply("update", expected_version=seen, id=record_id, record={"Job Number": "J1", "Status": "Completed"})
+    assert jobs.frame().loc[record_id, "Status"] == "Scheduled"
+
+    jobs.apply("update", expected_version=jobs.record_version(record_id), id=record_id,
+               record={"Job Number": "J1", "Status": "Completed"})
+    assert other.frame().loc[record_id, "Status"] == "Completed"
+
+
+def test_editing_a_deleted_record_is_a_conflict(jobs):
+    record_id = jobs.frame().index[0]
+    seen = jobs.record_version(record_id)
+    SharedTable("jobs.csv").apply("delete", id=record_id)
+
+    with pytest.raises(WriteConflict, match="deleted by someone else"):
+        jobs.apply("delete", expected_version=seen, id=record_id)
+    with pytest.raises(KeyError):
+        jobs.apply("delete", id=record_id)
+
+
+def test_order_keeps_only_the_current_version(jobs):
+    for n in range(5):
+        jobs.apply("insert", records=[{"Job Number": f"J{n + 2}", "Status": "Quote"}])
+        jobs.order()
+    jobs.order("Job Number", descending=True)
+
+    assert {key[0] for key in jobs._orders} == {jobs.version}
+    assert len(jobs._orders) == 2
+
+
+@pytest.mark.parametrize("kind, column", [
+    ("count_by", "Site"),
+    ("summary", "Litres"),
+    ("date_summary", "Date"),
+    ("key_index", "Site"),
+    ("refill_forecast", "mean_gap"),
+    ("refill_forecast", "consumption"),
+])
+def test_aggregates_match_a_rebuild_after_changes(data_dir, kind, column):
+    (data_dir / "refills.csv").write_text(
+        "Site,Date,Litres,Cost\nDepot,2026-01-02,120,50\nYard,2026-01-05,80,30\nDepot,2026-01-12,100,45\n"
+    )
+    refills = SharedTable("refills.csv")
+    refills.aggregate(kind, column)
+    ids = list(refills.frame().index)
+
+    refills.apply("insert", records=[{"Site": "Yard", "Date": "2026-01-20", "Litres": 90, "Cost": 35}])
+    refills.apply("update", id=ids[0], record={"Site": "depot ", "Date": "2026-01-03", "Litres": 125, "Cost": 52})
+    refills.apply("delete", id=ids[1])
+
+    rebuilt = AGGREGATES[kind](column)
+    rebuilt.build(refills.frame())
+    kept, fresh = refills.aggregate(kind, column), rebuilt.result()
+    if isinstance(fresh, pd.DataFrame):
+        pd.testing.assert_frame_equal(kept.sort_index(), fresh.sort_index(), check_like=True)
+    else:
+        assert kept == fresh
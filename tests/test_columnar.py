@@ -0,0 +1,38 @@
+import pandas as pd
+
+from cqvs_columnar import ColumnStore
+from cqvs_schemas import SCHEMAS
+
+
+def _refills():
+    df = pd.DataFrame({
+        "_id": ["a", "b", "c"], "Site": ["A", "B", "C"],
+        "Date": ["2026-01-01", "2026-01-02", "2026-01-03"], "Litres": [10.0, 20.0, 30.0], "Cost": [1.0, 2.0, 3.0],
+    })
+    return ColumnStore.from_frame(df, SCHEMAS["refills"])
+
+
+def test_frame_is_unchanged_by_later_deletes_and_updates():
+    store = _refills()
+    before = store.frame()
+    copied = before.copy()
+
+    store.pop("a")
+    store["b"] = {"Site": "B", "Date": "2026-02-01", "Litres": 99.0, "Cost": 9.0}
+
+    for df in (before, copied):
+        assert list(df.index) == ["a", "b", "c"]
+        assert list(df["Site"]) == ["A", "B", "C"]
+        assert list(df["Litres"]) == [10.0, 20.0, 30.0]
+    after = store.frame()
+    assert sorted(after.index) == ["b", "c"]
+    assert after.loc["b", "Litres"] == 99.0 and after.loc["c", "Site"] == "C"
+
+
+def test_frame_is_unchanged_by_appends():
+    store = _refills()
+    before = store.frame()
+    store.extend([{"_id": "d", "Site": "D", "Date": "2026-01-04", "Litres": 40.0, "Cost": 4.0}])
+
+    assert list(before.index) == ["a", "b", "c"]
+    assert list(store.frame().index) == ["a", "b", "c", "d"]
@@ -0,0 +1,52 @@
+import gzip
+import os
+
+import pandas as pd
+import pytest
+
+from cqvs_export import export_formats, export_to_file, iter_chunks
+from cqvs_stores import CsvStore
+
+
+@pytest.fixture
+def refills(data_dir):
+    rows = [f"Site {i % 3},2026-01-{i + 1:02d},{10 * i},{i}" for i in range(25)]
+    (data_dir / "refills.csv").write_text("Site,Date,Litres,Cost\n" + "\n".join(rows) + "\n")
+    return CsvStore()
+
+
+def test_chunks_cover_the_filtered_sorted_table(refills):
+    chunks = list(iter_chunks(refills, "refills", "site:1", sort_by="Litres", descending=True, chunk_rows=3))
+
+    assert [len(c) for c in chunks] == [3, 3, 2]
+    assert list(pd.concat(chunks)["Litres"]) == [220, 190, 160, 130, 100, 70, 40, 10]
+
+
+@pytest.mark.parametrize("fmt", export_formats())
+def test_export_round_trips(refills, fmt):
+    path = export_to_file(iter_chunks(refills, "refills", chunk_rows=10), fmt)
+    try:
+        if fmt == "Parquet":
+            df = pd.read_parquet(path)
+        else:
+            with (gzip.open(path, "rt") if fmt == "CSV (gzip)" else open(path)) as fh:
+                df = pd.read_csv(fh)
+    finally:
+        os.remove(path)
+
+    assert len(df) == 25
+    assert list(df.columns) == ["Site", "Date", "Litres", "Cost"]
+    assert df["Litres"].sum() == sum(10 * i for i in range(25))
+
+
+def test_failed_export_leaves_no_file(refills, tmp_path, monkeypatch):
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    monkeypatch.setattr("tempfile.tempdir", None)
+
+    def chunks():
+        yield refills.frame("refills", limit=5)
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        export_to_file(chunks(), "CSV")
+    assert not list(tmp_path.glob("cqvs_export_*"))
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from cqvs_forecast import FORECAST_METHODS, forecast, site_stats
+
+REFILLS = pd.DataFrame({
+    "Site": ["Depot", "Depot", "Depot", "Yard", "Shed"],
+    "Date": ["2026-01-01", "2026-01-11", "2026-01-31", "2026-01-05", "2026-01-09"],
+    "Litres": [100, 100, 200, 50, None],
+    "Cost": [10, 20, 30, 5, 7],
+})
+
+
+@pytest.mark.parametrize("method, gap", [
+    ("mean_gap", 15.0),        # 30 days over two gaps
+    ("ewm_gap", 16.7),         # gaps of 10 then 20 days, the latest weighted twice
+    ("consumption", 30.0),     # 200 L used in 30 days, the last 200 L lasts 30 more
+])
+def test_gap_per_method(method, gap):
+    stats = site_stats(REFILLS, method)
+
+    assert stats.loc["Depot", "Avg Refill Gap (days)"] == gap
+    assert stats.loc["Depot", "Refills"] == 3
+    assert stats.loc["Depot", "Last Refill"] == pd.Timestamp("2026-01-31")
+
+
+@pytest.mark.parametrize("method", FORECAST_METHODS)
+def test_single_refill_has_no_gap(method):
+    stats = site_stats(REFILLS, method)
+
+    assert stats["Avg Refill Gap (days)"][["Yard", "Shed"]].isna().all()
+
+
+def test_forecast_dates():
+    df = forecast(site_stats(REFILLS), now="2026-02-10 14:00").set_index("Site")
+
+    assert df.loc["Depot", "Next Refill Forecast"] == pd.Timestamp("2026-02-15")
+    assert df.loc["Depot", "Days Since Last"] == 10
+    assert pd.isna(df.loc["Yard", "Next Refill Forecast"])
+    assert list(df.index) == ["Depot", "Shed", "Yard"]
+
+
+def test_rows_without_site_or_date_are_ignored():
+    messy = pd.concat([REFILLS, pd.DataFrame({"Site": [None, "Depot"], "Date": ["2026-02-01", "someday"]})])
+
+    pd.testing.assert_frame_equal(site_stats(messy), site_stats(REFILLS))
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match="Unknown forecast method"):
+        site_stats(REFILLS, "median_gap")
@@ -0,0 +1,32 @@
+import io
+
+from cqvs_import import import_csv
+
+
+class _Store:
+    def __init__(self):
+        self.records = []
+
+    def distinct(self, entity, column):
+        return set()
+
+    def insert(self, entity, records):
+        self.records.extend(records)
+
+
+def test_import_keeps_text_as_text():
+    store = _Store()
+    source = io.StringIO("Client,ABN\nAcme,01234567890\n")
+
+    imported, rejected = import_csv(store, "clients", source)
+
+    assert imported == 1 and rejected.empty
+    assert store.records[0]["ABN"] == "01234567890"
+
+
+def test_import_converts_numbers_and_dates():
+    store = _Store()
+    import_csv(store, "refills", io.StringIO("Site,Date,Litres,Cost\nDepot,02/01/2026,120.5,50\n"))
+
+    assert store.records[0]["Litres"] == 120.5
+    assert store.records[0]["Date"] == "2026-01-02"
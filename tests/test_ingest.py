@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import cqvs_ingest
+from cqvs_import import validate_chunk
+
+
+def test_import_and_ingest_agree_on_repeats(data_dir):
+    chunk = pd.DataFrame({"Vehicle ID": ["TRK-1", " trk-1 ", "TRK-2"], "Registration": ["A1", "B2", "c3"]})
+    seen = {"Registration": {"c3"}}  # name_key()s of the values held
+
+    accepted, rejected = validate_chunk("vehicles", chunk, seen)
+
+    assert list(accepted["Vehicle ID"]) == ["TRK-1"]
+    assert list(rejected["Reason"]) == ["duplicate Vehicle ID in upload", "duplicate Registration"]
+    # an export of the same rows is deduped the same way
+    assert list(cqvs_ingest.dedupe("vehicles", chunk.iloc[:2])["Vehicle ID"]) == ["TRK-1"]
+
+
+def test_ingest_moves_a_file_that_fails_to_publish(data_dir, monkeypatch):
+    drop = data_dir / "drop"
+    drop.mkdir()
+    pd.DataFrame({"Vehicle ID": ["TRK-1"]}).to_csv(drop / "bad.csv", index=False)
+    pd.DataFrame({"Site Name": ["Depot"]}).to_csv(drop / "good.csv", index=False)
+    publish = cqvs_ingest.publish
+
+    def failing_publish(entity, rows):
+        if entity == "vehicles":
+            raise OSError("disk full")
+        publish(entity, rows)
+
+    monkeypatch.setattr(cqvs_ingest, "publish", failing_publish)
+    with ThreadPoolExecutor() as pool:
+        cqvs_ingest.ingest([str(drop / "bad.csv"), str(drop / "good.csv")], pool)
+
+    assert (drop / "failed" / "bad.csv").exists()
+    assert (drop / "done" / "good.csv").exists()
+
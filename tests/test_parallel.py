@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cqvs_parallel
+from cqvs_forecast import FORECAST_METHODS, forecast, site_stats
+from cqvs_parallel import parallel_refill_forecasts, parallel_wash_metrics
+from cqvs_wash import wash_metrics
+
+NOW = pd.Timestamp("2026-10-01 12:00")
+
+
+@pytest.fixture
+def small_partitions(monkeypatch):
+    """Split even a few rows across processes; the pool is stopped afterwards."""
+    monkeypatch.setattr(cqvs_parallel, "MIN_PARTITION_ROWS", 1)
+    yield
+    cqvs_parallel.shutdown_analytics_pool()
+
+
+def _scans(rng):
+    vehicles = [f"Truck {i}" for i in range(7)]
+    created = NOW - pd.to_timedelta(rng.uniform(0, 400, 300), unit="D")
+    scans = pd.DataFrame({"Created": created.round("min"), "Vehicle Name": rng.choice(vehicles, 300)})
+    # one vehicle last seen before the longest window, one only this week
+    old = pd.DataFrame({"Created": [NOW - pd.Timedelta(days=500)], "Vehicle Name": ["Trailer"]})
+    new = pd.DataFrame({"Created": [NOW - pd.Timedelta(days=2)], "Vehicle Name": ["Van"]})
+    return pd.concat([scans, old, new], ignore_index=True)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+def test_parallel_wash_metrics_match_a_single_pass(data_dir, small_partitions, workers):
+    scans = _scans(np.random.default_rng(0))
+    path = str(data_dir / "scans.csv")
+    scans.assign(Site="Depot").to_csv(path, index=False, date_format="%Y-%m-%d %H:%M")
+    intervals = {"Truck 1": 3.0, "Truck 4": 14.0}
+
+    got = parallel_wash_metrics(path, NOW, intervals=intervals, workers=workers)
+
+    expected = wash_metrics(scans, now=NOW, intervals=intervals)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_parallel_wash_metrics_without_a_scan_log(data_dir):
+    assert parallel_wash_metrics(str(data_dir / "missing.csv"), NOW, intervals={}).empty
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+def test_parallel_refill_forecasts_match_a_single_pass(small_partitions, workers):
+    rng = np.random.default_rng(1)
+    refills = pd.DataFrame({
+        "Site": rng.choice(["Depot", "Yard", "Shed", "Farm", None], 200),
+        "Date": (NOW - pd.to_timedelta(rng.integers(0, 365, 200), unit="D")).strftime("%Y-%m-%d"),
+        "Litres": rng.integers(50, 500, 200),
+        "Cost": rng.integers(10, 100, 200),
+    })
+
+    got = parallel_refill_forecasts(refills, NOW, workers=workers)
+
+    assert list(got) == FORECAST_METHODS
+    for method in FORECAST_METHODS:
+        pd.testing.assert_frame_equal(got[method], forecast(site_stats(refills, method), NOW))
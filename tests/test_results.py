@@ -0,0 +1,34 @@
+import os
+import time
+
+import pandas as pd
+
+from cqvs_results import current_result, describe_age, result_time, write_result
+
+
+def test_fresh_result_is_served_and_stale_one_recomputed(tmp_path):
+    directory = str(tmp_path)
+    write_result("wash", pd.DataFrame({"x": [1]}), directory)
+    assert abs((pd.Timestamp.now() - result_time("wash", directory)).total_seconds()) < 60
+
+    df, _ = current_result("wash", lambda: pd.DataFrame({"x": [2]}), directory=directory)
+    assert df["x"].tolist() == [1]
+
+    # the scheduler stopped an hour ago
+    hour_ago = time.time() - 3600
+    os.utime(os.path.join(directory, "wash.pkl"), (hour_ago, hour_ago))
+    df, computed = current_result("wash", lambda: pd.DataFrame({"x": [2]}), directory=directory)
+    assert df["x"].tolist() == [2]
+    assert pd.Timestamp.now() - computed < pd.Timedelta(minutes=1)
+
+
+def test_missing_result_is_computed(tmp_path):
+    df, _ = current_result("alerts", lambda: pd.DataFrame({"x": [3]}), directory=str(tmp_path))
+    assert df["x"].tolist() == [3]
+
+
+def test_describe_age():
+    now = pd.Timestamp("2026-01-01 12:00")
+    assert describe_age(now - pd.Timedelta(seconds=5), now) == "just now"
+    assert describe_age(now - pd.Timedelta(minutes=12), now) == "12 min ago"
+    assert describe_age(now - pd.Timedelta(days=2), now) == "2 days ago"
@@ -0,0 +1,46 @@
+import pytest
+
+import cqvs_rollups
+from cqvs_cache import shared_table
+from cqvs_storage import DATA_FILES
+
+
+@pytest.fixture
+def computed(data_dir, monkeypatch):
+    (data_dir / "refills.csv").write_text("Site,Date,Litres,Cost\nDepot,2026-01-02,100,50\nYard,2026-01-03,80,40\n")
+    (data_dir / "jobs.csv").write_text("Job Number,Site,Status\nJ1,Depot,Quote\nJ2,Yard,Completed\n")
+    monkeypatch.setattr(cqvs_rollups, "_cache", {})
+    sites = []
+    refill_figures = cqvs_rollups._refill_figures
+
+    def counted(site, method, now):
+        sites.append(site)
+        return refill_figures(site, method, now)
+
+    monkeypatch.setattr(cqvs_rollups, "_refill_figures", counted)
+    return sites
+
+
+def test_rollup_recomputed_only_for_the_changed_site(computed):
+    now = "2026-02-01 09:00"
+    depot = cqvs_rollups.site_rollup("Depot", now)
+    cqvs_rollups.site_rollup("Yard", now)
+    assert computed == ["Depot", "Yard"]
+
+    shared_table(DATA_FILES["refills"]).apply(
+        "insert", records=[{"Site": "yard", "Date": "2026-01-20", "Litres": 20, "Cost": 10}]
+    )
+    assert cqvs_rollups.site_rollup("Depot", now) is depot
+    assert cqvs_rollups.site_rollup("Yard", now)["Litres to Date"] == 100
+    assert computed == ["Depot", "Yard", "Yard"]
+
+    # a job moving away from Depot changes Depot's row
+    jobs = shared_table(DATA_FILES["jobs"])
+    job_id = jobs.frame().index[jobs.frame()["Job Number"] == "J1"][0]
+    jobs.apply("update", id=job_id, record={"Job Number": "J1", "Site": "Yard", "Status": "Quote"})
+    assert cqvs_rollups.site_rollup("Depot", now)["Open Jobs"] == 0
+
+
+def test_site_without_refills_has_zero_totals(computed):
+    row = cqvs_rollups.site_rollup("Nowhere", "2026-02-01")
+    assert (row["Refills"], row["Litres to Date"], row["Cost to Date ($AUD)"]) == (0, 0.0, 0.0)
@@ -0,0 +1,99 @@
+import os
+
+import pandas as pd
+
+from cqvs_scans import ScanLog, scan_activity
+
+
+def _write_scans(path, rows, mode="w"):
+    pd.DataFrame(rows, columns=["Created", "Vehicle Name", "Site"]).to_csv(
+        path, mode=mode, header=mode == "w", index=False
+    )
+
+
+def test_scan_activity_follows_the_file(data_dir):
+    path = str(data_dir / "scans.csv")
+    _write_scans(path, [("2026-10-01 08:00", "Truck 1", "Depot"), ("2026-10-02 08:00", "Truck 2", "Depot")])
+    since = pd.Timestamp("2026-09-30")
+
+    washes, daily, top = scan_activity(path, "Depot", since)
+    assert washes == 2
+    assert scan_activity(path, "Depot", since)[1] is daily  # memoized
+
+    _write_scans(path, [("2026-10-03 08:00", "Truck 1", "Depot")], mode="a")
+    washes, daily, top = scan_activity(path, "Depot", since)
+    assert washes == 3
+    assert top.loc["Truck 1"] == 2
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+def test_scan_log_reads_only_what_is_appended(data_dir):
+    path = str(data_dir / "scans.csv")
+    _write_scans(path, [("2026-10-01 08:00", "Truck 1", "Depot")])
+    log = ScanLog(path)
+    assert len(log.snapshot()[0]) == 1
+
+    _append(path, "2026-10-02 08:00,Truck 2,Depot\n2026-10-03 08:00,Tru")
+    scans, index = log.snapshot()
+    # the half-written line waits until it's complete
+    assert list(scans["Vehicle Name"]) == ["Truck 1", "Truck 2"]
+    _append(path, "ck 1,Yard\n")
+    scans, index = log.snapshot()
+
+    assert log.loads == 1
+    assert list(scans["Vehicle Name"]) == ["Truck 1", "Truck 2", "Truck 1"]
+    assert index.count("Depot") == 2 and index.count("Yard") == 1
+    assert index.count(None, pd.Timestamp("2026-10-02")) == 2
+
+
+def test_scan_log_indexes_out_of_order_rows(data_dir):
+    path = str(data_dir / "scans.csv")
+    _write_scans(path, [("2026-10-05 08:00", "Truck 1", "Depot")])
+    log = ScanLog(path)
+    log.snapshot()
+
+    _write_scans(path, [("2026-10-01 08:00", "Truck 2", "Depot")], mode="a")
+    scans, index = log.snapshot()
+
+    assert log.loads == 1
+    assert index.count("Depot", pd.Timestamp("2026-10-01"), pd.Timestamp("2026-10-02")) == 1
+    assert index.first_seen()["Truck 2"] == pd.Timestamp("2026-10-01 08:00")
+
+
+def test_scan_log_reloads_a_rewritten_file(data_dir):
+    path = str(data_dir / "scans.csv")
+    _write_scans(path, [("2026-10-01 08:00", "Truck 1", "Depot"), ("2026-10-02 08:00", "Truck 2", "Depot")])
+    log = ScanLog(path)
+    log.snapshot()
+
+    # same size, different contents
+    _write_scans(path, [("2026-10-01 08:00", "Truck 3", "Depot"), ("2026-10-02 08:00", "Truck 4", "Depot")])
+    os.utime(path, ns=(0, 0))
+    scans, index = log.snapshot()
+
+    assert log.loads == 2
+    assert list(scans["Vehicle Name"]) == ["Truck 3", "Truck 4"]
+
+
+def test_scan_log_sees_lines_appended_while_it_reads(data_dir, monkeypatch):
+    path = str(data_dir / "scans.csv")
+    _write_scans(path, [("2026-10-01 08:00", "Truck 1", "Depot")])
+    log = ScanLog(path)
+    log.snapshot()
+    read_tail = ScanLog._read_tail
+
+    def read_then_append(self):
+        read_tail(self)
+        # an exporter that doesn't take our lock writes just after the read
+        monkeypatch.setattr(ScanLog, "_read_tail", read_tail)
+        _append(path, "2026-10-03 08:00,Truck 3,Depot\n")
+
+    monkeypatch.setattr(ScanLog, "_read_tail", read_then_append)
+    _append(path, "2026-10-02 08:00,Truck 2,Depot\n")
+    log.snapshot()
+
+    assert list(log.snapshot()[0]["Vehicle Name"]) == ["Truck 1", "Truck 2", "Truck 3"]
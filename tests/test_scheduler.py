@@ -0,0 +1,31 @@
+import pytest
+
+import cqvs_scheduler
+
+
+class _Stop(Exception):
+    pass
+
+
+def test_run_retries_after_a_failed_pass(monkeypatch, capsys):
+    passes = []
+
+    def recompute():
+        passes.append(None)
+        if len(passes) == 1:
+            raise OSError("scans.csv replaced mid-read")
+        return "key"
+
+    def sleep(seconds):
+        if len(passes) == 2:
+            raise _Stop
+
+    monkeypatch.setattr(cqvs_scheduler, "fleet_version", lambda: "fleet")
+    monkeypatch.setattr(cqvs_scheduler, "_jobs_version", lambda: 1)
+    monkeypatch.setattr(cqvs_scheduler, "recompute", recompute)
+    monkeypatch.setattr(cqvs_scheduler.time, "sleep", sleep)
+    with pytest.raises(_Stop):
+        cqvs_scheduler.run(poll=0)
+
+    out = capsys.readouterr().out
+    assert "recompute failed" in out and "results updated" in out
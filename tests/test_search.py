@@ -0,0 +1,60 @@
+import pandas as pd
+
+from cqvs_cache import SharedTable
+from cqvs_search import TextIndex, parse_query
+
+COLUMNS = ["Task", "Assigned To", "Status"]
+
+
+def test_parse_query():
+    assert parse_query('assigned_to:Jonny pump* "bay two" x', COLUMNS) == [
+        ("Assigned To", "jonny", False), (None, "pump", True), (None, "bay two", False), (None, "x", False),
+    ]
+    # an unknown column prefix is just text
+    assert parse_query("colour:red", COLUMNS) == [(None, "colour:red", False)]
+
+
+def _index():
+    df = pd.DataFrame({
+        "Task": ["Service pump", "Clean bay two", "Pump out sump"],
+        "Assigned To": ["Jonny", "Sam", "jonny"],
+        "Status": ["Open", "Completed", "Open"],
+    }, index=["a", "b", "c"])
+    return TextIndex.from_frame(df)
+
+
+def test_terms_are_anded_and_scoped():
+    index = _index()
+
+    def search(text):
+        return index.search(parse_query(text, COLUMNS))
+
+    assert search("pump") == {"a", "c"}
+    assert search("pump status:open jonny") == {"a", "c"}
+    assert search("task:pu*") == {"c"}
+    assert search('"bay two"') == {"b"}
+    assert search("status:pump") == set()
+    # shorter than a trigram: every value is checked
+    assert search("am") == {"b"}
+    assert search("") is None
+
+
+def test_index_follows_updates_and_deletes():
+    index = _index()
+    index.update("a", {"Task": "Service pump", "Assigned To": "Jonny", "Status": "Open"},
+                 {"Task": "Service filter", "Assigned To": "Jonny", "Status": "Open"})
+    index.delete("c", {"Task": "Pump out sump", "Assigned To": "jonny", "Status": "Open"})
+    index.insert([{"_id": "d", "Task": "Pump test", "Status": "Open"}], "_id")
+
+    assert index.search(parse_query("pump", COLUMNS)) == {"d"}
+    assert index.search(parse_query("filter", COLUMNS)) == {"a"}
+
+
+def test_table_search_returns_positions_in_insertion_order(data_dir):
+    (data_dir / "tasks.csv").write_text("Task,Status\nWash bay,Open\nPump,Open\nWash truck,Completed\n")
+    tasks = SharedTable("tasks.csv")
+    tasks.apply("insert", records=[{"Task": "Wash yard", "Status": "Open"}])
+
+    found = tasks.frame().iloc[tasks.search("wash status:open")]
+
+    assert list(found["Task"]) == ["Wash bay", "Wash yard"]
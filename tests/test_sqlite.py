@@ -0,0 +1,92 @@
+import pytest
+
+import cqvs_sqlite
+from cqvs_schemas import InvalidRecord
+
+
+@pytest.fixture
+def conn(tmp_path):
+    return cqvs_sqlite.connect(str(tmp_path / "cqvs.db"))
+
+
+def test_numbers_typed_into_a_form_are_stored_as_numbers(conn):
+    cqvs_sqlite.insert("refills", [{"Site": "A", "Date": "2026-01-02", "Litres": "120", "Cost": ""}], conn=conn)
+    cqvs_sqlite.insert("refills", [{"Site": "B", "Date": "2026-01-03", "Litres": "95.5", "Cost": "10"}], conn=conn)
+
+    rows = conn.execute("SELECT typeof(Litres), typeof(Cost) FROM refills ORDER BY rowid").fetchall()
+    assert rows == [("real", "null"), ("real", "real")]
+    assert cqvs_sqlite.column_stats("refills", "Litres", conn=conn) == (95.5, 120.0, 215.5, 2)
+    assert list(cqvs_sqlite.query("refills", sort_by="Litres", conn=conn)["Site"]) == ["B", "A"]
+
+
+def test_untyped_table_is_rebuilt_with_types(conn):
+    conn.execute('CREATE TABLE refills ("Site", "Litres")')
+    conn.execute("INSERT INTO refills VALUES ('A', '120')")
+    conn.commit()
+
+    cqvs_sqlite.insert("refills", [{"Site": "B", "Litres": "7"}], conn=conn)
+
+    assert conn.execute("SELECT typeof(Litres) FROM refills").fetchall() == [("real",), ("real",)]
+    assert cqvs_sqlite.column_stats("refills", "Litres", conn=conn)[2] == 127.0
+
+
+def test_records_are_addressed_by_id(conn):
+    cqvs_sqlite.insert("tasks", [{"Task": "Wash"}, {"Task": "Refill"}, {"Task": "Quote"}], conn=conn)
+    ids = list(cqvs_sqlite.query("tasks", conn=conn).index)
+    cqvs_sqlite.delete("tasks", ids[0], conn=conn)
+    conn.execute("VACUUM")
+
+    cqvs_sqlite.update("tasks", ids[2], {"Task": "Quoted"}, expected_version=1, conn=conn)
+
+    tasks = cqvs_sqlite.query("tasks", conn=conn)
+    assert list(tasks.index) == ids[1:]
+    assert tasks.loc[ids[2], "Task"] == "Quoted"
+    assert cqvs_sqlite.record_version("tasks", ids[2], conn=conn) == 2
+    with pytest.raises(cqvs_sqlite.WriteConflict):
+        cqvs_sqlite.update("tasks", ids[2], {"Task": "Stale"}, expected_version=1, conn=conn)
+    with pytest.raises(KeyError):
+        cqvs_sqlite.update("tasks", ids[0], {"Task": "Gone"}, conn=conn)
+    assert cqvs_sqlite.changes_since("tasks", 0, conn=conn)[1] == set(ids)
+
+
+def test_rowid_table_gets_ids(conn):
+    conn.execute('CREATE TABLE tasks ("Task")')
+    conn.executemany("INSERT INTO tasks VALUES (?)", [("Wash",), ("Refill",)])
+    conn.commit()
+
+    tasks = cqvs_sqlite.query("tasks", conn=conn)
+
+    assert list(tasks["Task"]) == ["Wash", "Refill"]
+    assert all(isinstance(i, str) and len(i) == 12 for i in tasks.index) and tasks.index.is_unique
+
+
+def test_import_keeps_csv_ids(data_dir):
+    from cqvs_storage import load_records
+
+    (data_dir / "tasks.csv").write_text("Task,Status\nWash,Open\nRefill,Done\n")
+    csv_ids = list(load_records("tasks.csv").frame().index)
+
+    cqvs_sqlite.import_csvs({"tasks": "tasks.csv"}, path=str(data_dir / "cqvs.db"))
+
+    assert list(cqvs_sqlite.query("tasks", conn=cqvs_sqlite.connect(str(data_dir / "cqvs.db"))).index) == csv_ids
+
+
+def test_delete_trims_change_log(conn, monkeypatch):
+    monkeypatch.setattr(cqvs_sqlite, "CHANGE_LOG_SIZE", 2)
+    cqvs_sqlite.insert("tasks", [{"Task": str(n)} for n in range(5)], conn=conn)
+    for record_id in cqvs_sqlite.query("tasks", conn=conn).index:
+        cqvs_sqlite.delete("tasks", record_id, conn=conn)
+
+    assert conn.execute(f"SELECT COUNT(*) FROM {cqvs_sqlite.CHANGES_TABLE}").fetchone()[0] == 2
+
+
+def test_records_must_fit_schema(conn):
+    cqvs_sqlite.insert("refills", [{"Site": "A", "Litres": "120"}], conn=conn)
+    record_id = cqvs_sqlite.query("refills", conn=conn).index[0]
+
+    with pytest.raises(InvalidRecord):
+        cqvs_sqlite.insert("refills", [{"Site": "B", "Litres": "lots"}], conn=conn)
+    with pytest.raises(InvalidRecord):
+        cqvs_sqlite.update("refills", record_id, {"Site": "A", "Litres": "lots"}, conn=conn)
+
+    assert cqvs_sqlite.query("refills", conn=conn)["Litres"].tolist() == [120.0]
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from cqvs_columnar import ID_COLUMN
+import cqvs_storage
+from cqvs_storage import COMPACTING_SUFFIX, JOURNAL_SUFFIX, append_change, compact, file_lock, load_records
+
+
+def _journal(path, *entries):
+    with open(str(path) + JOURNAL_SUFFIX, "w", encoding="utf-8") as fh:
+        for entry in entries:
+            fh.write(json.dumps(entry) + "\n")
+
+
+def _legacy_tasks(data_dir):
+    # written before record IDs: no _id column, journal entries address rows by position
+    path = data_dir / "tasks.csv"
+    pd.DataFrame({"Task": ["Wash", "Refill", "Inspect"], "Status": ["Open"] * 3}).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("entry, expected", [
+    ({"op": "insert", "records": [{"Task": "Quote", "Status": "Open"}]}, ["Wash", "Refill", "Inspect", "Quote"]),
+    ({"op": "update", "index": 0, "record": {"Task": "Rewash", "Status": "Done"}}, ["Rewash", "Refill", "Inspect"]),
+    ({"op": "delete", "index": 1}, ["Wash", "Inspect"]),
+])
+def test_legacy_journal_migrates(data_dir, entry, expected):
+    path = _legacy_tasks(data_dir)
+    _journal(path, entry)
+
+    tasks = load_records(str(path)).frame()
+
+    assert list(tasks["Task"]) == expected
+    assert tasks.index.is_unique and all(isinstance(i, str) for i in tasks.index)
+    # folded into the snapshot, with the IDs written out
+    on_disk = pd.read_csv(path, dtype=str)
+    assert list(on_disk[ID_COLUMN]) == list(tasks.index)
+    assert not (data_dir / ("tasks.csv" + JOURNAL_SUFFIX)).exists()
+
+
+def test_journal_replays_over_snapshot(data_dir):
+    path = _legacy_tasks(data_dir)
+    ids = list(load_records(str(path)).frame().index)
+    _journal(
+        path,
+        {"op": "insert", "records": [{ID_COLUMN: "new1", "Task": "Quote", "Status": "Open"}]},
+        {"op": "update", "id": ids[0], "record": {"Task": "Wash", "Status": "Done"}},
+        {"op": "delete", "id": ids[1]},
+    )
+
+    tasks = load_records(str(path)).frame()
+
+    assert set(tasks.index) == {ids[0], ids[2], "new1"}
+    assert tasks.loc[ids[0], "Status"] == "Done"
+
+
+def test_torn_journal_line_is_ignored(data_dir):
+    path = _legacy_tasks(data_dir)
+    load_records(str(path))
+    with open(str(path) + JOURNAL_SUFFIX, "w", encoding="utf-8") as fh:
+        fh.write(json.dumps({"op": "insert", "records": [{ID_COLUMN: "a", "Task": "Quote"}]}) + "\n")
+        fh.write('{"op": "insert", "rec')
+
+    assert list(load_records(str(path)).frame()["Task"]) == ["Wash", "Refill", "Inspect", "Quote"]
+
+
+def test_compact_folds_journal_into_snapshot(data_dir):
+    path = str(_legacy_tasks(data_dir))
+    ids = list(load_records(path).frame().index)
+    append_change(path, "insert", records=[{ID_COLUMN: "new1", "Task": "Quote", "Status": "Open"}])
+    append_change(path, "delete", id=ids[1])
+
+    compact(path)
+
+    assert not (data_dir / ("tasks.csv" + JOURNAL_SUFFIX)).exists()
+    assert not (data_dir / ("tasks.csv" + COMPACTING_SUFFIX)).exists()
+    on_disk = pd.read_csv(path, dtype=str)
+    assert set(on_disk[ID_COLUMN]) == {ids[0], ids[2], "new1"}
+    assert set(load_records(path).frame().index) == {ids[0], ids[2], "new1"}
+
+
+def test_compact_recovers_a_dead_compaction(data_dir):
+    path = str(_legacy_tasks(data_dir))
+    ids = list(load_records(path).frame().index)
+    # a compaction rotated the journal and died; writes since went to a fresh one
+    append_change(path, "delete", id=ids[0])
+    os.replace(path + JOURNAL_SUFFIX, path + COMPACTING_SUFFIX)
+    append_change(path, "delete", id=ids[1])
+
+    compact(path)
+
+    assert not (data_dir / ("tasks.csv" + COMPACTING_SUFFIX)).exists()
+    # the rotated journal is in the snapshot, the fresh one still pending
+    assert list(pd.read_csv(path, dtype=str)[ID_COLUMN]) == ids[1:]
+    assert (data_dir / ("tasks.csv" + JOURNAL_SUFFIX)).exists()
+    assert list(load_records(path).frame().index) == [ids[2]]
+    compact(path)
+    assert list(pd.read_csv(path, dtype=str)[ID_COLUMN]) == [ids[2]]
+
+
+def test_compact_skips_while_another_runs(data_dir):
+    path = str(_legacy_tasks(data_dir))
+    load_records(path)
+    append_change(path, "insert", records=[{ID_COLUMN: "new1", "Task": "Quote", "Status": "Open"}])
+    running = file_lock(path + COMPACTING_SUFFIX)
+    result = []
+    # held by another thread, so this one mustn't fold the same journal
+    with running:
+        worker = threading.Thread(target=lambda: result.append(compact(path)))
+        worker.start()
+        worker.join()
+
+    assert (data_dir / ("tasks.csv" + JOURNAL_SUFFIX)).exists()
+    assert "new1" in load_records(path).frame().index
+
+
+def test_compaction_that_died_after_the_swap_is_not_replayed(data_dir, monkeypatch):
+    path = str(_legacy_tasks(data_dir))
+    ids = list(load_records(path).frame().index)
+    append_change(path, "insert", records=[{ID_COLUMN: "new1", "Task": "Quote", "Status": "Open"}])
+    append_change(path, "delete", id=ids[0])
+
+    def crash(*paths):
+        raise OSError("killed")
+
+    # dies between swapping in the snapshot and removing the rotated journal
+    monkeypatch.setattr(cqvs_storage, "_remove", crash)
+    with pytest.raises(OSError):
+        compact(path)
+    monkeypatch.undo()
+    # coarse timestamps: the snapshot is no newer than the journal
+    os.utime(path, ns=(0, 0))
+    os.utime(path + COMPACTING_SUFFIX, ns=(0, 0))
+
+    tasks = load_records(path).frame()
+
+    assert sorted(tasks.index) == sorted([ids[1], ids[2], "new1"])
+    assert not (data_dir / ("tasks.csv" + COMPACTING_SUFFIX)).exists()
+
+
+def test_replaying_applied_entries_changes_nothing(data_dir):
+    path = str(_legacy_tasks(data_dir))
+    ids = list(load_records(path).frame().index)
+    entries = [
+        {"op": "insert", "records": [{ID_COLUMN: ids[0], "Task": "Wash", "Status": "Open"}]},
+        {"op": "delete", "id": "gone"},
+    ]
+    _journal(path, *entries)
+
+    assert list(load_records(path).frame()["Task"]) == ["Wash", "Refill", "Inspect"]
@@ -0,0 +1,39 @@
+import pytest
+
+import cqvs_relations
+import cqvs_sqlite
+from cqvs_stores import CsvStore, SqliteStore
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def store(request, data_dir, monkeypatch):
+    """Each backend, used by the modules that follow references."""
+    monkeypatch.setattr(cqvs_sqlite, "DB_PATH", str(data_dir / "cqvs.db"))
+    store = SqliteStore() if request.param == "sqlite" else CsvStore()
+    monkeypatch.setattr(cqvs_relations, "store", store)
+    return store
+
+
+def test_references_follow_the_configured_store(store):
+    store.insert("jobs", [
+        {"Job Number": "J1", "Site": "Depot", "Status": "Quote"},
+        {"Job Number": "J2", "Site": "Yard", "Status": "Quote"},
+        {"Job Number": "J3", "Site": " depot ", "Status": "Completed"},
+    ])
+
+    jobs = cqvs_relations.referencing("jobs", "Site", "DEPOT")
+
+    assert list(jobs["Job Number"]) == ["J1", "J3"]
+    assert set(jobs.index) == cqvs_relations.ids_where("jobs", "Site", "depot")
+    assert cqvs_relations.records("jobs", []).empty
+
+
+def test_table_version_moves_with_every_write(store):
+    store.insert("tasks", [{"Task": "Wash"}])
+    before = store.table_version("tasks")
+    record_id = store.frame("tasks").index[0]
+
+    store.update("tasks", record_id, {"Task": "Rewash"})
+
+    assert store.table_version("tasks") != before
+    assert store.records("tasks", [record_id])["Task"].tolist() == ["Rewash"]
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from cqvs_wash import wash_metrics
+
+NOW = pd.Timestamp("2026-03-01 12:00")
+
+
+def _scans(vehicle, *days_ago):
+    return pd.DataFrame({
+        "Created": [NOW - pd.Timedelta(days=d) for d in days_ago],
+        "Vehicle Name": [vehicle] * len(days_ago),
+    })
+
+
+def _row(metrics, vehicle, days):
+    return metrics[(metrics["Vehicle"] == vehicle) & (metrics["Time Range (days)"] == days)].iloc[0]
+
+
+def test_no_scans_gives_typed_empty_frame():
+    metrics = wash_metrics(_scans("T1").astype({"Created": "datetime64[ns]"}), now=NOW)
+    assert metrics.empty
+    assert metrics.nsmallest(10, "Success Score").empty
+
+
+def test_window_shorter_than_interval_still_expects_a_wash():
+    # washed 10 days ago and not since: the last 7-day slot was missed
+    metrics = wash_metrics(_scans("T1", 10, 40), now=NOW, windows=[5, 30])
+    short = _row(metrics, "T1", 5)
+    assert (short["Washes"], short["Missed Washes"], short["Success Score"]) == (0, 1, 0)
+
+    metrics = wash_metrics(_scans("T1", 2, 40), now=NOW, windows=[5, 30])
+    short = _row(metrics, "T1", 5)
+    assert (short["Missed Washes"], short["Success Score"]) == (0, 100)
+
+
+def test_interval_override_per_vehicle():
+    scans = pd.concat([_scans("T1", *range(0, 30, 3)), _scans("T2", *range(0, 30, 3))])
+    metrics = wash_metrics(scans, now=NOW, windows=[30], intervals={"T2": 1})
+    assert _row(metrics, "T1", 30)["Success Score"] == 100
+    # active for 27 days: 27 daily slots, 9 of them washed
+    assert _row(metrics, "T2", 30)["Missed Washes"] == 18